@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Asset Manifest
+Inventory the local assets and external links the project references:
+
+    python3 scripts/asset_manifest.py
+    python3 scripts/asset_manifest.py --max-size 500
+
+Local assets are the images referenced from web/src/content/** (hero
+images, markdown images, imports) plus every file under web/src/assets/.
+They are hashed in a thread pool and reported when missing, over the size
+limit or duplicated (same content under several paths). In the same pass,
+the links of data records and content pages are normalized and
+deduplicated, and their type is checked against the one detected from the
+URL.
+
+Hashes and extracted references are cached by file signature, so re-runs
+only read files that changed. The manifest is written to build/assets.json.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from corpus import (
+    BUILD_DIR, DATA_DIR, ROOT_DIR, FileCache, composite_id, file_signature,
+    iter_paths, load_json,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+WEB_DIR = ROOT_DIR / 'web'
+CONTENT_DIR = WEB_DIR / 'src' / 'content'
+ASSETS_DIR = WEB_DIR / 'src' / 'assets'
+PUBLIC_DIR = WEB_DIR / 'public'
+MANIFEST_FILE = BUILD_DIR / 'assets.json'
+
+# Bump when cached entries change shape
+MANIFEST_VERSION = 1
+
+DEFAULT_MAX_SIZE_KB = 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+ASSET_SUFFIXES = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.avif',
+                  '.mp4', '.webm', '.pdf'}
+CONTENT_SUFFIXES = {'.md', '.mdx'}
+
+# Collections whose records carry spec.links
+LINK_COLLECTIONS = ['places', 'people', 'provinces']
+
+# Query parameters that only track the visitor
+TRACKING_PARAMS = {'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid', 'si'}
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Link types that detect_link_type recognizes from the URL alone; other
+# detections ('website') are too generic to contradict a curated type
+DETECTABLE_TYPES = {'image', 'video', 'map'}
+
+# References inside markdown/MDX pages
+CONTENT_REFERENCES = [
+    re.compile(r'^heroImage:\s*[\'"]?([^\'"\n]+?)[\'"]?\s*$', re.MULTILINE),
+    re.compile(r'!?\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)'),
+    re.compile(r'\bsrc=[\'"]([^\'"]+)[\'"]'),
+    re.compile(r'^import\s+.+?\s+from\s+[\'"]([^\'"]+)[\'"]', re.MULTILINE),
+]
+
+
+# ============================================================================
+# LINKS
+# ============================================================================
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form used to deduplicate links
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, and gives empty paths a '/'. The remaining query keeps its
+    original order and encoding.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+
+    query = '&'.join(
+        param for param in parts.query.split('&')
+        if param and not is_tracking_param(param.split('=', 1)[0].lower())
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+def is_tracking_param(name: str) -> bool:
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def is_external(reference: str) -> bool:
+    return reference.startswith(('http://', 'https://'))
+
+
+# ============================================================================
+# EXTRACTION
+# ============================================================================
+
+def root_key(path: Path) -> str:
+    """Repository-relative POSIX path (manifest and cache key)"""
+    try:
+        return Path(path).relative_to(ROOT_DIR).as_posix()
+    except ValueError:
+        return Path(path).resolve().relative_to(ROOT_DIR).as_posix()
+
+
+def record_links(collection: str, path: Path) -> Dict[str, Any]:
+    doc = load_json(path)
+    return {
+        'ref': composite_id(collection, path, doc),
+        'links': [
+            {'url': link['url'], 'type': link.get('type')}
+            for link in doc.get('spec', {}).get('links', []) or []
+            if link.get('url')
+        ],
+    }
+
+
+def content_references(path: Path) -> Dict[str, Any]:
+    """Local assets and external links referenced from a content page"""
+    text = Path(path).read_text(encoding='utf-8')
+    assets = []
+    links = []
+
+    for pattern in CONTENT_REFERENCES:
+        for match in pattern.finditer(text):
+            reference = match.group(1).strip()
+            if is_external(reference):
+                links.append({'url': reference, 'type': None})
+                continue
+
+            target = reference.split('#', 1)[0].split('?', 1)[0]
+            if Path(target).suffix.lower() not in ASSET_SUFFIXES:
+                continue
+            if target.startswith('/'):
+                resolved = PUBLIC_DIR / target.lstrip('/')
+            else:
+                resolved = Path(os.path.normpath(Path(path).parent / target))
+            assets.append(root_key(resolved))
+
+    return {
+        'ref': root_key(path),
+        'assets': sorted(set(assets)),
+        'links': links,
+    }
+
+
+def hash_file(path: Path) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        # hashlib releases the GIL on large buffers, so threads hash in parallel
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return {'sha256': digest.hexdigest(), 'size': os.path.getsize(path)}
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+class ManifestBuilder:
+    """Collect, hash and check assets and links, reusing cached results"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, content_dir: Path = CONTENT_DIR,
+                 assets_dir: Path = ASSETS_DIR, max_size_kb: int = DEFAULT_MAX_SIZE_KB,
+                 workers: Optional[int] = None):
+        self.data_dir = Path(data_dir)
+        self.content_dir = Path(content_dir)
+        self.assets_dir = Path(assets_dir)
+        self.max_size = max_size_kb * 1024
+        self.workers = workers
+        self.cache = FileCache('assets', tag=str(MANIFEST_VERSION))
+        self.keys = set()
+        self.detector = None
+
+    def log(self, message: str):
+        print(f"[ASSETS] {message}")
+
+    def cached(self, path: Path, extract) -> Any:
+        key = root_key(path)
+        signature = file_signature(path)
+        self.keys.add(key)
+
+        value = self.cache.get(key, signature)
+        if value is None:
+            value = extract(path)
+            self.cache.put(key, signature, value)
+        return value
+
+    def detect_link_type(self, url: str) -> str:
+        if self.detector is None:
+            from kml_to_places import NormalizeStage
+            self.detector = NormalizeStage()
+        return self.detector.detect_link_type(url)
+
+    # ------------------------------------------------------------------------
+
+    def collect_sources(self) -> List[Dict[str, Any]]:
+        """Link and asset references of every data record and content page"""
+        sources = []
+        for collection in LINK_COLLECTIONS:
+            for path in iter_paths(collection, self.data_dir):
+                sources.append(self.cached(path, lambda p, c=collection: record_links(c, p)))
+
+        for path in sorted(self.content_dir.rglob('*')):
+            if path.suffix in CONTENT_SUFFIXES:
+                sources.append(self.cached(path, content_references))
+        return sources
+
+    def hash_assets(self, paths: List[Path]) -> Dict[str, Dict[str, Any]]:
+        """key -> {sha256, size}; only files missing from the cache are read"""
+        hashes = {}
+        pending = []
+
+        for path in paths:
+            key = root_key(path)
+            signature = file_signature(path)
+            self.keys.add(key)
+            value = self.cache.get(key, signature)
+            if value is None:
+                pending.append((key, path, signature))
+            else:
+                hashes[key] = value
+
+        if pending:
+            self.log(f"Hashing {len(pending)} files ({len(hashes)} cached)")
+            with ThreadPoolExecutor(self.workers) as pool:
+                for (key, _, signature), value in zip(pending, pool.map(hash_file, [p for _, p, _ in pending])):
+                    self.cache.put(key, signature, value)
+                    hashes[key] = value
+
+        return hashes
+
+    def check_links(self, sources: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Group links by normalized URL; report in-record duplicates and type mismatches"""
+        links: Dict[str, Dict[str, Any]] = {}
+        problems = []
+
+        for source in sources:
+            seen = {}
+            for link in source['links']:
+                normalized = normalize_url(link['url'])
+                if normalized in seen:
+                    # Pages may link the same site twice in prose; records should not
+                    if 'assets' in source:
+                        continue
+                    problems.append(f"{source['ref']}: duplicate link {link['url']} "
+                                    f"(same as {seen[normalized]})")
+                    continue
+                seen[normalized] = link['url']
+
+                entry = links.get(normalized)
+                if entry is None:
+                    detected = self.detect_link_type(normalized)
+                    entry = links[normalized] = {
+                        'url': normalized,
+                        'detectedType': detected,
+                        'types': [],
+                        'variants': [],
+                        'referencedBy': [],
+                    }
+
+                if link['type'] and link['type'] not in entry['types']:
+                    entry['types'].append(link['type'])
+                # Checked for every record, not just the first with this type
+                if (link['type'] and entry['detectedType'] in DETECTABLE_TYPES
+                        and link['type'] != entry['detectedType']):
+                    problems.append(f"{source['ref']}: link {link['url']} has type "
+                                    f"'{link['type']}' but looks like '{entry['detectedType']}'")
+                if link['url'] != normalized and link['url'] not in entry['variants']:
+                    entry['variants'].append(link['url'])
+                entry['referencedBy'].append(source['ref'])
+
+        return links, problems
+
+    # ------------------------------------------------------------------------
+
+    def run(self) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        start = time.perf_counter()
+        self.keys = set()
+        sources = self.collect_sources()
+
+        # Referenced assets plus everything in the assets tree (to catch
+        # duplicates and unused files)
+        referenced: Dict[str, List[str]] = {}
+        for source in sources:
+            for key in source.get('assets', []):
+                referenced.setdefault(key, []).append(source['ref'])
+
+        on_disk = {root_key(p): p for p in sorted(self.assets_dir.rglob('*'))
+                   if p.is_file() and p.suffix.lower() in ASSET_SUFFIXES}
+        for key in referenced:
+            path = ROOT_DIR / key
+            if key not in on_disk and path.is_file():
+                on_disk[key] = path
+
+        hashes = self.hash_assets(list(on_disk.values()))
+        links, link_problems = self.check_links(sources)
+
+        problems: Dict[str, List[str]] = {
+            'missing': [], 'oversized': [], 'duplicates': [], 'unused': [], 'links': link_problems,
+        }
+
+        for key, refs in sorted(referenced.items()):
+            if key not in hashes:
+                problems['missing'].append(f"{key} (referenced by {', '.join(refs)})")
+
+        by_hash: Dict[str, List[str]] = {}
+        assets = {}
+        for key in sorted(hashes):
+            value = hashes[key]
+            by_hash.setdefault(value['sha256'], []).append(key)
+            assets[key] = {**value, 'referencedBy': referenced.get(key, [])}
+
+            if value['size'] > self.max_size:
+                problems['oversized'].append(f"{key} ({value['size'] / 1024:.0f} KB)")
+            if key not in referenced:
+                problems['unused'].append(key)
+
+        for keys in by_hash.values():
+            if len(keys) > 1:
+                problems['duplicates'].append(', '.join(keys))
+
+        self.cache.prune(self.keys)
+        self.cache.save()
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'assets': assets,
+            'links': sorted(links.values(), key=lambda entry: entry['url']),
+            'problems': problems,
+        }
+        self.log(f"{len(assets)} assets, {len(links)} unique links "
+                 f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return manifest, problems
+
+    def write(self, manifest: Dict[str, Any], output: Path):
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        self.log(f"Wrote {output}")
+
+
+def print_problems(problems: Dict[str, List[str]], verbose: bool) -> int:
+    """Print the report; return the number of errors (missing assets)"""
+    labels = {
+        'missing': 'Missing assets',
+        'oversized': 'Oversized assets',
+        'duplicates': 'Duplicate assets (same content)',
+        'links': 'Link issues',
+        'unused': 'Unreferenced assets',
+    }
+    for name, label in labels.items():
+        entries = problems[name]
+        if not entries:
+            continue
+        print(f"\n{label} ({len(entries)}):")
+        # Unreferenced files are informational only; list them on demand
+        if name == 'unused' and not verbose:
+            print("  (use --verbose to list)")
+            continue
+        for entry in entries:
+            print(f"  {'✗' if name == 'missing' else '!'} {entry}")
+    return len(problems['missing'])
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build a manifest of local assets and external links, with checks'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=MANIFEST_FILE,
+        help='Manifest file (default: build/assets.json)'
+    )
+
+    parser.add_argument(
+        '--max-size',
+        type=int,
+        default=DEFAULT_MAX_SIZE_KB,
+        help=f'Flag assets larger than this many KB (default: {DEFAULT_MAX_SIZE_KB})'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Hashing threads (default: Python\'s ThreadPoolExecutor default)'
+    )
+
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help='Also list unreferenced assets'
+    )
+
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    builder = ManifestBuilder(args.data_dir.resolve(), max_size_kb=args.max_size, workers=args.jobs)
+    manifest, problems = builder.run()
+    builder.write(manifest, args.output)
+
+    if print_problems(problems, args.verbose):
+        print(f"\n✗ Error: {len(problems['missing'])} referenced asset(s) missing\n")
+        sys.exit(1)
+    print("\n✓ Success!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Script Benchmarks
+Time the command-line scripts end to end, the way they are run by hand:
+
+    python3 scripts/benchmark.py
+    python3 scripts/benchmark.py startup --repeat 20
+
+Each benchmark runs in a fresh interpreter so import and setup costs are
+included. Results are the best and median wall-clock times in milliseconds.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+SCRIPTS_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPTS_DIR.parent
+
+SAMPLE_PLACEMARKS = 200
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+def write_sample_kml(path: Path, count: int = SAMPLE_PLACEMARKS):
+    """Synthetic My Maps export with points around Casablanca"""
+    placemarks = []
+    for i in range(count):
+        lon = -7.62 + (i % 20) * 0.001
+        lat = 33.58 + (i // 20) * 0.001
+        placemarks.append(
+            f"<Placemark><name>Sample Place {i}</name>"
+            f"<description>Built in 19{30 + i % 30}&lt;br&gt;https://example.com/{i}</description>"
+            f"<Point><coordinates>{lon:.6f},{lat:.6f},0</coordinates></Point></Placemark>"
+        )
+
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>'
+        + ''.join(placemarks) +
+        '</Document></kml>',
+        encoding='utf-8'
+    )
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+
+def script(name: str, *args: str) -> List[str]:
+    return [sys.executable, str(SCRIPTS_DIR / name), *args]
+
+
+def benchmarks(work_dir: Path) -> Dict[str, List[str]]:
+    """name -> command line"""
+    kml = work_dir / 'sample.kml'
+    write_sample_kml(kml)
+
+    provinces = str(SCRIPTS_DIR / 'mappings' / 'provinces.geojson')
+
+    return {
+        'startup': script('kml_to_places.py', '--help'),
+        # Same options as a full run, so unused stage setup shows up here
+        'parse': script('kml_to_places.py', str(kml), '--stages', 'parse',
+                        '--province-geojson', provinces,
+                        '-o', str(work_dir / 'parsed.json')),
+        # Everything but the save stage, which writes into data/places/
+        'convert': script('kml_to_places.py', str(kml),
+                          '--stages', 'parse,normalize,enrich,validate,transform',
+                          '--province-geojson', provinces,
+                          '-o', str(work_dir / 'places.json')),
+        'stats': script('stats.py', '-o', str(work_dir / 'stats.md')),
+    }
+
+
+def measure(command: List[str], repeat: int) -> Tuple[float, float]:
+    """Best and median wall time (ms) over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the Mrrakc scripts'
+    )
+
+    parser.add_argument(
+        'names',
+        nargs='*',
+        help='Benchmarks to run (default: all)'
+    )
+
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=10,
+        help='Runs per benchmark (default: 10)'
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        suite = benchmarks(Path(tmp))
+
+        unknown = [name for name in args.names if name not in suite]
+        if unknown:
+            print(f"\n✗ Error: Unknown benchmark: {', '.join(unknown)} "
+                  f"(expected one of {', '.join(suite)})\n")
+            sys.exit(1)
+
+        print(f"{'benchmark':<12} {'best':>10} {'median':>10}")
+        for name, command in suite.items():
+            if args.names and name not in args.names:
+                continue
+            best, median = measure(command, args.repeat)
+            print(f"{name:<12} {best:>8.1f}ms {median:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Province Boundaries
+Precomputed lookup structure for finding the province of a coordinate:
+
+    python3 scripts/boundaries.py locate 33.5943 -7.6145
+    python3 scripts/boundaries.py stats
+
+provinces.geojson holds full-resolution ADM2 rings, but most points are far
+from any border. Each province is therefore precomputed into:
+
+- a bounding box, grouped under its region (ADM1, from data/provinces) so a
+  point is first matched against the 12 regions, then their provinces
+- a coarse grid over the bounding box whose cells are marked inside,
+  outside or border; inside cells are the "safe boxes" that accept a point
+  without touching the ring, outside cells reject it
+- Douglas-Peucker simplified rings for border cells: the simplified ring
+  stays within SIMPLIFY_TOLERANCE of the exact one, so its answer is kept
+  whenever the point is farther than that from it
+- the exact rings, only used for points right on a border
+
+Rings are tested with the even-odd rule across exterior rings and holes,
+so points inside a hole do not belong to the province.
+
+Points in no province at all (offshore, or in slivers between polygons)
+fall back to the province with the nearest boundary, found through a grid
+of bucketed ring edges. The fallback is reported as ambiguous when another
+province's boundary is almost as close.
+
+The precomputed structure is cached in .cache/boundaries.json and rebuilt
+when the GeoJSON or the province files change.
+"""
+
+import argparse
+import math
+import sys
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from corpus import (
+    DATA_DIR, ROOT_DIR, SCHEMA_DIR, FileCache, collection_signature,
+    file_signature, load_json, load_provinces,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PROVINCE_GEOJSON = ROOT_DIR / 'scripts' / 'mappings' / 'provinces.geojson'
+REGIONS_ENUM = SCHEMA_DIR / 'enums' / 'regions.json'
+
+# Bump when the precomputed structure changes shape
+BOUNDARIES_VERSION = 1
+
+# Max deviation of simplified rings from the exact ones, in degrees (~500 m)
+SIMPLIFY_TOLERANCE = 0.005
+
+# Cells per side of each province grid
+GRID_SIZE = 64
+
+# Nearest-boundary fallback for points outside every province: edges are
+# bucketed in a grid of this cell size (degrees)
+SEGMENT_CELL_SIZE = 0.05
+
+# Farther than this from every province, a point gets no province at all
+MAX_FALLBACK_KM = 30.0
+
+# A fallback is ambiguous when another province is this close to the nearest
+AMBIGUITY_KM = 1.0
+
+KM_PER_DEGREE = 111.2
+
+INSIDE, OUTSIDE, BORDER = 'i', 'o', 'b'
+
+Ring = List[Tuple[float, float]]
+
+
+# ============================================================================
+# GEOMETRY
+# ============================================================================
+
+def ring_crossings(ring: Ring, x: float, y: float) -> int:
+    """Number of ring edges crossed by a ray from (x, y) towards +x"""
+    crossings = 0
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y1 > y) != (y2 > y):
+            if x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                crossings += 1
+        x1, y1 = x2, y2
+    return crossings
+
+
+def point_in_rings(rings: List[Ring], x: float, y: float) -> bool:
+    """Even-odd test over all rings of a (multi)polygon, so holes are excluded"""
+    return sum(ring_crossings(ring, x, y) for ring in rings) % 2 == 1
+
+
+def segment_distance(x: float, y: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    """Planar distance from (x, y) to the segment (x1, y1)-(x2, y2)"""
+    dx, dy = x2 - x1, y2 - y1
+    if dx == 0 and dy == 0:
+        return math.hypot(x - x1, y - y1)
+    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+
+def rings_test_with_margin(rings: List[Ring], x: float, y: float) -> Tuple[bool, float]:
+    """Even-odd test plus the distance from (x, y) to the nearest edge"""
+    crossings = 0
+    nearest = math.inf
+    for ring in rings:
+        x1, y1 = ring[-1]
+        for x2, y2 in ring:
+            if (y1 > y) != (y2 > y):
+                if x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                    crossings += 1
+            distance = segment_distance(x, y, x1, y1, x2, y2)
+            if distance < nearest:
+                nearest = distance
+            x1, y1 = x2, y2
+    return crossings % 2 == 1, nearest
+
+
+def simplify_ring(ring: Ring, tolerance: float) -> Ring:
+    """
+    Douglas-Peucker simplification of a closed ring
+
+    The ring is split at the vertex farthest from its first one, and each
+    half is simplified as an open polyline. Rings that would collapse are
+    returned unchanged.
+    """
+    if ring[0] == ring[-1]:
+        ring = ring[:-1]
+    if len(ring) < 4:
+        return ring
+
+    x0, y0 = ring[0]
+    split = max(range(len(ring)), key=lambda i: (ring[i][0] - x0) ** 2 + (ring[i][1] - y0) ** 2)
+    points = ring + [ring[0]]
+
+    keep = [False] * len(points)
+    keep[0] = keep[split] = keep[-1] = True
+    stack = [(0, split), (split, len(points) - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x1, y1 = points[first]
+        x2, y2 = points[last]
+        farthest, index = -1.0, first
+        for i in range(first + 1, last):
+            distance = segment_distance(points[i][0], points[i][1], x1, y1, x2, y2)
+            if distance > farthest:
+                farthest, index = distance, i
+        if farthest > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    simplified = [p for p, kept in zip(points[:-1], keep[:-1]) if kept]
+    return simplified if len(simplified) >= 3 else ring
+
+
+def geometry_rings(geometry: Dict[str, Any]) -> List[Ring]:
+    """Exterior rings and holes of a Polygon or MultiPolygon"""
+    if geometry.get('type') == 'Polygon':
+        polygons = [geometry.get('coordinates', [])]
+    elif geometry.get('type') == 'MultiPolygon':
+        polygons = geometry.get('coordinates', [])
+    else:
+        return []
+    return [[(float(p[0]), float(p[1])) for p in ring]
+            for polygon in polygons for ring in polygon if len(ring) >= 3]
+
+
+def rings_bbox(rings: List[Ring]) -> List[float]:
+    xs = [x for ring in rings for x, _ in ring]
+    ys = [y for ring in rings for _, y in ring]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def classify_grid(rings: List[Ring], bbox: List[float], size: int) -> str:
+    """
+    Mark each grid cell inside, outside or border
+
+    Every cell overlapped by an edge's bounding box is a border cell (a
+    conservative superset of the cells the ring crosses). The others are
+    wholly on one side, decided by scanning the row through the cell centres.
+    """
+    minx, miny, maxx, maxy = bbox
+    cell_w = (maxx - minx) / size or 1e-9
+    cell_h = (maxy - miny) / size or 1e-9
+
+    def col(x): return min(size - 1, max(0, int((x - minx) / cell_w)))
+    def row(y): return min(size - 1, max(0, int((y - miny) / cell_h)))
+
+    cells = [OUTSIDE] * (size * size)
+    for ring in rings:
+        x1, y1 = ring[-1]
+        for x2, y2 in ring:
+            for r in range(row(min(y1, y2)), row(max(y1, y2)) + 1):
+                for c in range(col(min(x1, x2)), col(max(x1, x2)) + 1):
+                    cells[r * size + c] = BORDER
+            x1, y1 = x2, y2
+
+    for r in range(size):
+        y = miny + (r + 0.5) * cell_h
+        # x positions where the row crosses an edge; parity gives inside/outside
+        crossings = []
+        for ring in rings:
+            x1, y1 = ring[-1]
+            for x2, y2 in ring:
+                if (y1 > y) != (y2 > y):
+                    crossings.append((x2 - x1) * (y - y1) / (y2 - y1) + x1)
+                x1, y1 = x2, y2
+        crossings.sort()
+
+        for c in range(size):
+            if cells[r * size + c] == BORDER:
+                continue
+            x = minx + (c + 0.5) * cell_w
+            # Crossings to the right of x, as in ring_crossings
+            if (len(crossings) - bisect_left(crossings, x)) % 2 == 1:
+                cells[r * size + c] = INSIDE
+
+    return ''.join(cells)
+
+
+# ============================================================================
+# LOCATOR
+# ============================================================================
+
+class ProvinceBoundary:
+    """Precomputed geometry of one province"""
+
+    __slots__ = ('id', 'region', 'bbox', 'rings', 'simplified', 'grid', 'cell_w', 'cell_h')
+
+    def __init__(self, province_id: str, region: Optional[str], bbox: List[float],
+                 rings: List[Ring], simplified: List[Ring], grid: str):
+        self.id = province_id
+        self.region = region
+        self.bbox = bbox
+        self.rings = rings
+        self.simplified = simplified
+        self.grid = grid
+        self.cell_w = (bbox[2] - bbox[0]) / GRID_SIZE or 1e-9
+        self.cell_h = (bbox[3] - bbox[1]) / GRID_SIZE or 1e-9
+
+    @classmethod
+    def build(cls, province_id: str, region: Optional[str], rings: List[Ring]) -> 'ProvinceBoundary':
+        bbox = rings_bbox(rings)
+        simplified = [simplify_ring(ring, SIMPLIFY_TOLERANCE) for ring in rings]
+        return cls(province_id, region, bbox, rings, simplified, classify_grid(rings, bbox, GRID_SIZE))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'region': self.region,
+            'bbox': self.bbox,
+            'rings': self.rings,
+            'simplified': self.simplified,
+            'grid': self.grid,
+        }
+
+    @classmethod
+    def from_json(cls, value: Dict[str, Any]) -> 'ProvinceBoundary':
+        def rings(raw): return [[tuple(p) for p in ring] for ring in raw]
+        return cls(value['id'], value['region'], value['bbox'],
+                   rings(value['rings']), rings(value['simplified']), value['grid'])
+
+    def in_bbox(self, x: float, y: float) -> bool:
+        minx, miny, maxx, maxy = self.bbox
+        return minx <= x <= maxx and miny <= y <= maxy
+
+    def cell(self, x: float, y: float) -> str:
+        c = min(GRID_SIZE - 1, int((x - self.bbox[0]) / self.cell_w))
+        r = min(GRID_SIZE - 1, int((y - self.bbox[1]) / self.cell_h))
+        return self.grid[r * GRID_SIZE + c]
+
+    def contains(self, x: float, y: float, stats: Optional[Dict[str, int]] = None) -> bool:
+        """Point-in-province test, from the cheapest structure that can decide"""
+        cell = self.cell(x, y)
+        if cell != BORDER:
+            if stats is not None:
+                stats['grid'] += 1
+            return cell == INSIDE
+
+        inside, margin = rings_test_with_margin(self.simplified, x, y)
+        if margin > SIMPLIFY_TOLERANCE:
+            if stats is not None:
+                stats['simplified'] += 1
+            return inside
+
+        if stats is not None:
+            stats['exact'] += 1
+        return point_in_rings(self.rings, x, y)
+
+
+class NearestProvince(NamedTuple):
+    """Result of the nearest-boundary fallback"""
+
+    province: str
+    distance_km: float
+    runner_up: Optional[str] = None
+    runner_up_km: Optional[float] = None
+
+    @property
+    def ambiguous(self) -> bool:
+        return self.runner_up is not None
+
+    def describe(self) -> str:
+        text = f"outside all province boundaries, nearest is {self.province} ({self.distance_km:.2f} km)"
+        if self.ambiguous:
+            text += f"; ambiguous with {self.runner_up} ({self.runner_up_km:.2f} km)"
+        return text
+
+
+class SegmentIndex:
+    """Ring edges of every province, bucketed in a uniform grid"""
+
+    def __init__(self, provinces: List[ProvinceBoundary], cell_size: float = SEGMENT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.ids = [province.id for province in provinces]
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, float, float, float, float]]] = {}
+
+        for index, province in enumerate(provinces):
+            for ring in province.rings:
+                x1, y1 = ring[-1]
+                for x2, y2 in ring:
+                    edge = (index, x1, y1, x2, y2)
+                    for cx in range(self.cell(min(x1, x2)), self.cell(max(x1, x2)) + 1):
+                        for cy in range(self.cell(min(y1, y2)), self.cell(max(y1, y2)) + 1):
+                            self.cells.setdefault((cx, cy), []).append(edge)
+                    x1, y1 = x2, y2
+
+    def cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def nearest(self, lon: float, lat: float, max_km: float = MAX_FALLBACK_KM,
+                margin_km: float = AMBIGUITY_KM) -> Optional[NearestProvince]:
+        """
+        Province with the closest boundary, and a runner-up within margin_km
+
+        Cells are visited in growing square rings around the point; the
+        search stops once everything unvisited is farther than the distances
+        that could still change the answer.
+        """
+        # Local equirectangular projection to kilometres
+        kx = KM_PER_DEGREE * math.cos(math.radians(lat))
+        ky = KM_PER_DEGREE
+        cell_km = self.cell_size * min(kx, ky)
+
+        best: Dict[int, float] = {}
+        seen = set()
+        cx, cy = self.cell(lon), self.cell(lat)
+        k = 0
+
+        while True:
+            for x in range(cx - k, cx + k + 1):
+                for y in range(cy - k, cy + k + 1):
+                    if max(abs(x - cx), abs(y - cy)) != k:
+                        continue
+                    for edge in self.cells.get((x, y), ()):
+                        if edge in seen:
+                            continue
+                        seen.add(edge)
+                        index, x1, y1, x2, y2 = edge
+                        distance = segment_distance(0.0, 0.0, (x1 - lon) * kx, (y1 - lat) * ky,
+                                                    (x2 - lon) * kx, (y2 - lat) * ky)
+                        if distance < best.get(index, math.inf):
+                            best[index] = distance
+
+            # Everything outside the visited block is at least k cells away
+            explored_km = k * cell_km
+            ranked = sorted(best.items(), key=lambda item: item[1])
+            if ranked:
+                limit = ranked[0][1] + margin_km
+                if len(ranked) > 1:
+                    limit = min(limit, ranked[1][1])
+                if explored_km >= limit:
+                    break
+            if explored_km > max_km:
+                break
+            k += 1
+
+        if not ranked or ranked[0][1] > max_km:
+            return None
+
+        index, distance = ranked[0]
+        if len(ranked) > 1 and ranked[1][1] - distance <= margin_km:
+            return NearestProvince(self.ids[index], distance, self.ids[ranked[1][0]], ranked[1][1])
+        return NearestProvince(self.ids[index], distance)
+
+
+class ProvinceLocator:
+    """Region-first province lookup over precomputed boundaries"""
+
+    def __init__(self, provinces: List[ProvinceBoundary]):
+        self.provinces = provinces
+
+        # region -> (bbox, provinces), in GeoJSON order within each region
+        self.regions: Dict[Optional[str], Tuple[List[float], List[ProvinceBoundary]]] = {}
+        for province in provinces:
+            bbox, members = self.regions.setdefault(province.region, (list(province.bbox), []))
+            bbox[0], bbox[1] = min(bbox[0], province.bbox[0]), min(bbox[1], province.bbox[1])
+            bbox[2], bbox[3] = max(bbox[2], province.bbox[2]), max(bbox[3], province.bbox[3])
+            members.append(province)
+
+        self.stats = {'grid': 0, 'simplified': 0, 'exact': 0, 'nearest': 0}
+        self.segments: Optional[SegmentIndex] = None
+
+    @classmethod
+    def from_geojson(cls, geojson: Dict[str, Any], regions: Dict[str, Optional[str]]) -> 'ProvinceLocator':
+        provinces = []
+        for feature in geojson.get('features', []):
+            properties = feature.get('properties', {})
+            province_id = properties.get('id') or properties.get('province_id')
+            rings = geometry_rings(feature.get('geometry', {}))
+            if province_id and rings:
+                provinces.append(ProvinceBoundary.build(province_id, regions.get(province_id), rings))
+        return cls(provinces)
+
+    def locate(self, lon: float, lat: float) -> Optional[str]:
+        """Province containing the point, or None"""
+        for (minx, miny, maxx, maxy), members in self.regions.values():
+            if not (minx <= lon <= maxx and miny <= lat <= maxy):
+                continue
+            for province in members:
+                if province.in_bbox(lon, lat) and province.contains(lon, lat, self.stats):
+                    return province.id
+        return None
+
+    def nearest(self, lon: float, lat: float) -> Optional[NearestProvince]:
+        """Nearest-boundary fallback for points that locate() does not place"""
+        if self.segments is None:
+            # Only built once a point actually falls outside every province
+            self.segments = SegmentIndex(self.provinces)
+        self.stats['nearest'] += 1
+        return self.segments.nearest(lon, lat)
+
+
+def province_regions(data_dir: Path = DATA_DIR, regions_enum: Path = REGIONS_ENUM) -> Dict[str, Optional[str]]:
+    """province/<id> -> region, keeping only regions listed in the enum"""
+    known = set(load_json(regions_enum).get('enum', [])) if Path(regions_enum).exists() else None
+    return {
+        province_id: spec.get('region') if known is None or spec.get('region') in known else None
+        for province_id, spec in load_provinces(data_dir).items()
+    }
+
+
+def load_locator(geojson_file: Path = PROVINCE_GEOJSON, data_dir: Path = DATA_DIR,
+                 geojson: Optional[Dict[str, Any]] = None) -> ProvinceLocator:
+    """Load the precomputed locator, rebuilding it when its sources changed"""
+    geojson_file = Path(geojson_file)
+    tag = f"{BOUNDARIES_VERSION}:{GRID_SIZE}:{SIMPLIFY_TOLERANCE}:{collection_signature(['provinces'], data_dir)}"
+    cache = FileCache('boundaries', tag=tag)
+    signature = file_signature(geojson_file)
+    key = geojson_file.resolve().as_posix()
+
+    cached = cache.get(key, signature)
+    if cached is not None:
+        return ProvinceLocator([ProvinceBoundary.from_json(value) for value in cached])
+
+    if geojson is None:
+        geojson = load_json(geojson_file)
+    locator = ProvinceLocator.from_geojson(geojson, province_regions(data_dir))
+    cache.put(key, signature, [province.to_json() for province in locator.provinces])
+    cache.save()
+    return locator
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Look up Mrrakc provinces from coordinates'
+    )
+
+    parser.add_argument(
+        '-p', '--province-geojson',
+        type=Path,
+        default=PROVINCE_GEOJSON,
+        help='GeoJSON file with province boundaries (default: scripts/mappings/provinces.geojson)'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    locate_parser = subparsers.add_parser('locate', help='Province of a coordinate')
+    locate_parser.add_argument('lat', type=float, help='Latitude')
+    locate_parser.add_argument('lon', type=float, help='Longitude')
+
+    subparsers.add_parser('stats', help='Locate every place and report how lookups were decided')
+
+    args = parser.parse_args()
+
+    if not args.province_geojson.exists():
+        print(f"Error: GeoJSON file not found: {args.province_geojson}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    locator = load_locator(args.province_geojson, args.data_dir)
+    loaded = time.perf_counter()
+
+    if args.command == 'locate':
+        province = locator.locate(args.lon, args.lat)
+        if province:
+            print(province)
+            return
+        nearest = locator.nearest(args.lon, args.lat)
+        if nearest is None:
+            print(f"No province within {MAX_FALLBACK_KM:g} km")
+        else:
+            print(f"{nearest.province} ({nearest.describe()})")
+        return
+
+    from corpus import iter_paths
+
+    points = []
+    for path in iter_paths('places', args.data_dir):
+        location = load_json(path).get('spec', {}).get('location', {})
+        if location.get('latitude') is not None and location.get('longitude') is not None:
+            points.append((location['longitude'], location['latitude']))
+
+    located = time.perf_counter()
+    found = fallback = ambiguous = 0
+    for lon, lat in points:
+        if locator.locate(lon, lat):
+            found += 1
+            continue
+        nearest = locator.nearest(lon, lat)
+        if nearest:
+            fallback += 1
+            ambiguous += nearest.ambiguous
+    elapsed = time.perf_counter() - located
+
+    simplified_points = sum(len(r) for p in locator.provinces for r in p.simplified)
+    exact_points = sum(len(r) for p in locator.provinces for r in p.rings)
+    print(f"Provinces: {len(locator.provinces)} in {len(locator.regions)} regions "
+          f"(loaded in {(loaded - start) * 1000:.1f} ms)")
+    print(f"Ring vertices: {exact_points} exact, {simplified_points} simplified")
+    print(f"Located {found} of {len(points)} places in {elapsed * 1000:.1f} ms, "
+          f"{fallback} more by nearest boundary ({ambiguous} ambiguous)")
+    print(f"Decided by grid: {locator.stats['grid']}, simplified rings: "
+          f"{locator.stats['simplified']}, exact rings: {locator.stats['exact']}, "
+          f"nearest boundary: {locator.stats['nearest']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Mrrakc SQLite Builder
+Load places, people, provinces, maps and plans into a local SQLite database
+for ad-hoc queries.
+
+- Normalized tables (one row per record, child tables for lists)
+- places_rtree: R*Tree over place coordinates
+- search: FTS5 over names, descriptions/bios and timeline text
+- Indexes on kind, province and timePeriods
+
+Rebuilds are incremental: only files whose signature changed since the
+last build are deleted and re-inserted.
+
+Example: museums in Rabat with an Art Deco timeline entry before 1950
+
+    SELECT DISTINCT p.name
+    FROM places p
+    JOIN timeline t ON t.owner_id = p.id
+    WHERE p.kind = 'culture/museum'
+      AND p.province_id = 'province/rabat'
+      AND t.date < '1950'
+      AND p.id IN (SELECT ref FROM search WHERE search MATCH 'timeline:"art deco"');
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Any, List
+
+from corpus import (
+    BUILD_DIR, COLLECTIONS, DATA_DIR, composite_id, file_signature,
+    iter_paths, load_json, place_ref, relative_key,
+)
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+
+# Bump to force a full rebuild when the schema below changes
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    collection TEXT NOT NULL,
+    signature TEXT NOT NULL
+);
+
+CREATE TABLE provinces (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    region TEXT,
+    country TEXT,
+    path TEXT NOT NULL
+);
+
+CREATE TABLE people (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    bio TEXT,
+    birth_place_id TEXT,
+    path TEXT NOT NULL
+);
+
+CREATE TABLE person_designations (
+    person_id TEXT NOT NULL,
+    designation TEXT NOT NULL
+);
+
+CREATE TABLE places (
+    pk INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    slug TEXT NOT NULL,
+    kind TEXT,
+    name TEXT NOT NULL,
+    description TEXT,
+    province_id TEXT,
+    longitude REAL,
+    latitude REAL,
+    altitude REAL,
+    access_type TEXT,
+    access_status TEXT,
+    path TEXT NOT NULL
+);
+
+CREATE TABLE place_people (
+    place_id TEXT NOT NULL,
+    person_id TEXT NOT NULL,
+    relationship TEXT,
+    comment TEXT
+);
+
+CREATE TABLE place_time_periods (
+    place_id TEXT NOT NULL,
+    time_period TEXT NOT NULL
+);
+
+CREATE TABLE place_activities (
+    place_id TEXT NOT NULL,
+    activity TEXT NOT NULL
+);
+
+CREATE TABLE place_items (
+    place_id TEXT NOT NULL,
+    item TEXT NOT NULL
+);
+
+CREATE TABLE links (
+    owner_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    type TEXT
+);
+
+CREATE TABLE timeline (
+    owner_id TEXT NOT NULL,
+    date TEXT,
+    title TEXT,
+    description TEXT
+);
+
+CREATE TABLE maps (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    strategy TEXT,
+    query TEXT,
+    path TEXT NOT NULL
+);
+
+CREATE TABLE map_places (
+    map_id TEXT NOT NULL,
+    place_id TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE plans (
+    id TEXT PRIMARY KEY,
+    kind TEXT,
+    title TEXT NOT NULL,
+    description TEXT,
+    pub_date TEXT,
+    duration_value REAL,
+    duration_unit TEXT,
+    difficulty TEXT,
+    path TEXT NOT NULL
+);
+
+CREATE TABLE plan_steps (
+    plan_id TEXT NOT NULL,
+    position TEXT NOT NULL,
+    title TEXT NOT NULL,
+    type TEXT,
+    description TEXT,
+    optional INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE plan_step_places (
+    plan_id TEXT NOT NULL,
+    position TEXT NOT NULL,
+    place_id TEXT NOT NULL
+);
+
+CREATE VIRTUAL TABLE places_rtree USING rtree(
+    pk, min_lon, max_lon, min_lat, max_lat
+);
+
+CREATE VIRTUAL TABLE search USING fts5(
+    ref UNINDEXED, collection UNINDEXED, name, description, timeline,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE INDEX idx_places_kind ON places(kind);
+CREATE INDEX idx_places_province ON places(province_id);
+CREATE INDEX idx_places_path ON places(path);
+CREATE INDEX idx_people_path ON people(path);
+CREATE INDEX idx_people_birth_place ON people(birth_place_id);
+CREATE INDEX idx_person_designations ON person_designations(person_id);
+CREATE INDEX idx_place_people_place ON place_people(place_id);
+CREATE INDEX idx_place_people_person ON place_people(person_id);
+CREATE INDEX idx_place_time_periods ON place_time_periods(time_period, place_id);
+CREATE INDEX idx_place_time_periods_place ON place_time_periods(place_id);
+CREATE INDEX idx_place_activities ON place_activities(place_id);
+CREATE INDEX idx_place_items ON place_items(place_id);
+CREATE INDEX idx_links_owner ON links(owner_id);
+CREATE INDEX idx_timeline_owner ON timeline(owner_id);
+CREATE INDEX idx_timeline_date ON timeline(date);
+CREATE INDEX idx_map_places_map ON map_places(map_id);
+CREATE INDEX idx_map_places_place ON map_places(place_id);
+CREATE INDEX idx_plan_steps_plan ON plan_steps(plan_id);
+CREATE INDEX idx_plan_step_places_plan ON plan_step_places(plan_id);
+CREATE INDEX idx_plan_step_places_place ON plan_step_places(place_id);
+"""
+
+
+# ============================================================================
+# LOADERS
+# ============================================================================
+
+def timeline_text(spec: Dict[str, Any]) -> str:
+    return '\n'.join(
+        f"{event.get('title', '')}. {event.get('description', '')}"
+        for event in spec.get('timeline', [])
+    )
+
+
+def insert_links_and_timeline(db: sqlite3.Connection, owner_id: str, spec: Dict[str, Any]):
+    db.executemany(
+        "INSERT INTO links (owner_id, url, title, type) VALUES (?, ?, ?, ?)",
+        [(owner_id, link.get('url'), link.get('title'), link.get('type'))
+         for link in spec.get('links', []) if link.get('url')]
+    )
+    db.executemany(
+        "INSERT INTO timeline (owner_id, date, title, description) VALUES (?, ?, ?, ?)",
+        [(owner_id, event.get('date'), event.get('title'), event.get('description'))
+         for event in spec.get('timeline', [])]
+    )
+
+
+def load_province(db: sqlite3.Connection, key: str, ref: str, doc: Dict[str, Any]):
+    spec = doc.get('spec', {})
+    db.execute(
+        "INSERT INTO provinces (id, name, region, country, path) VALUES (?, ?, ?, ?, ?)",
+        (ref, spec.get('name'), spec.get('region'), spec.get('country'), key)
+    )
+
+
+def load_person(db: sqlite3.Connection, key: str, ref: str, doc: Dict[str, Any]):
+    spec = doc.get('spec', {})
+    db.execute(
+        "INSERT INTO people (id, name, bio, birth_place_id, path) VALUES (?, ?, ?, ?, ?)",
+        (ref, spec.get('name'), spec.get('bio'), spec.get('birthPlace'), key)
+    )
+    db.executemany(
+        "INSERT INTO person_designations (person_id, designation) VALUES (?, ?)",
+        [(ref, designation) for designation in spec.get('designations', [])]
+    )
+    insert_links_and_timeline(db, ref, spec)
+    db.execute(
+        "INSERT INTO search (ref, collection, name, description, timeline) VALUES (?, ?, ?, ?, ?)",
+        (ref, 'people', spec.get('name'), spec.get('bio'), timeline_text(spec))
+    )
+
+
+def load_place(db: sqlite3.Connection, key: str, ref: str, doc: Dict[str, Any]):
+    spec = doc.get('spec', {})
+    location = spec.get('location', {})
+    access = spec.get('access', {})
+
+    cursor = db.execute(
+        """INSERT INTO places (id, slug, kind, name, description, province_id,
+                               longitude, latitude, altitude, access_type,
+                               access_status, path)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (ref, spec.get('id'), doc.get('kind'), spec.get('name'), spec.get('description'),
+         location.get('province'), location.get('longitude'), location.get('latitude'),
+         location.get('altitude'), access.get('type'), access.get('status'), key)
+    )
+
+    lon = location.get('longitude')
+    lat = location.get('latitude')
+    if lon is not None and lat is not None:
+        db.execute(
+            "INSERT INTO places_rtree (pk, min_lon, max_lon, min_lat, max_lat) VALUES (?, ?, ?, ?, ?)",
+            (cursor.lastrowid, lon, lon, lat, lat)
+        )
+
+    db.executemany(
+        "INSERT INTO place_people (place_id, person_id, relationship, comment) VALUES (?, ?, ?, ?)",
+        [(ref, person.get('id'), ', '.join(person.get('relationship', [])), person.get('comment'))
+         for person in spec.get('people', []) if person.get('id')]
+    )
+    db.executemany(
+        "INSERT INTO place_time_periods (place_id, time_period) VALUES (?, ?)",
+        [(ref, period) for period in spec.get('timePeriods', [])]
+    )
+    db.executemany(
+        "INSERT INTO place_activities (place_id, activity) VALUES (?, ?)",
+        [(ref, activity) for activity in spec.get('activities', [])]
+    )
+    db.executemany(
+        "INSERT INTO place_items (place_id, item) VALUES (?, ?)",
+        [(ref, item) for item in spec.get('items', [])]
+    )
+    insert_links_and_timeline(db, ref, spec)
+    db.execute(
+        "INSERT INTO search (ref, collection, name, description, timeline) VALUES (?, ?, ?, ?, ?)",
+        (ref, 'places', spec.get('name'), spec.get('description'), timeline_text(spec))
+    )
+
+
+def load_map(db: sqlite3.Connection, key: str, ref: str, doc: Dict[str, Any]):
+    spec = doc.get('spec', {})
+    content = spec.get('content', {})
+    db.execute(
+        "INSERT INTO maps (id, title, description, strategy, query, path) VALUES (?, ?, ?, ?, ?, ?)",
+        (ref, spec.get('title'), spec.get('description'), spec.get('strategy'),
+         content.get('query'), key)
+    )
+    # Map ids are "<province>/<place>"; store them as place references
+    db.executemany(
+        "INSERT INTO map_places (map_id, place_id, position) VALUES (?, ?, ?)",
+        [(ref, place_ref(place_id), position)
+         for position, place_id in enumerate(content.get('ids', []))]
+    )
+
+
+def load_plan(db: sqlite3.Connection, key: str, ref: str, doc: Dict[str, Any]):
+    spec = doc.get('spec', {})
+    duration = spec.get('estimatedDuration', {})
+    db.execute(
+        """INSERT INTO plans (id, kind, title, description, pub_date, duration_value,
+                              duration_unit, difficulty, path)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (ref, doc.get('kind'), spec.get('title'), spec.get('description'), spec.get('pubDate'),
+         duration.get('value'), duration.get('unit'), spec.get('difficulty'), key)
+    )
+
+    # Steps are flattened with dotted positions ("2.1" is the first sub-step of step 2)
+    def insert_steps(steps: List[Dict[str, Any]], prefix: str):
+        for i, step in enumerate(steps, start=1):
+            position = f"{prefix}{i}"
+            db.execute(
+                """INSERT INTO plan_steps (plan_id, position, title, type, description, optional)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (ref, position, step.get('title'), step.get('type'), step.get('description'),
+                 int(bool(step.get('optional'))))
+            )
+            db.executemany(
+                "INSERT INTO plan_step_places (plan_id, position, place_id) VALUES (?, ?, ?)",
+                [(ref, position, place_ref(place_id)) for place_id in step.get('placeIds', [])]
+            )
+            insert_steps(step.get('subSteps', []), f"{position}.")
+
+    insert_steps(spec.get('steps', []), '')
+
+
+LOADERS = {
+    'provinces': load_province,
+    'people': load_person,
+    'places': load_place,
+    'maps': load_map,
+    'plans': load_plan,
+}
+
+
+def delete_path(db: sqlite3.Connection, collection: str, key: str):
+    """Remove every row that was loaded from a data file"""
+    if collection == 'provinces':
+        db.execute("DELETE FROM provinces WHERE path = ?", (key,))
+
+    elif collection == 'people':
+        for (ref,) in db.execute("SELECT id FROM people WHERE path = ?", (key,)).fetchall():
+            db.execute("DELETE FROM person_designations WHERE person_id = ?", (ref,))
+            db.execute("DELETE FROM links WHERE owner_id = ?", (ref,))
+            db.execute("DELETE FROM timeline WHERE owner_id = ?", (ref,))
+            db.execute("DELETE FROM search WHERE ref = ?", (ref,))
+        db.execute("DELETE FROM people WHERE path = ?", (key,))
+
+    elif collection == 'places':
+        for pk, ref in db.execute("SELECT pk, id FROM places WHERE path = ?", (key,)).fetchall():
+            db.execute("DELETE FROM places_rtree WHERE pk = ?", (pk,))
+            for table in ['place_people', 'place_time_periods', 'place_activities', 'place_items']:
+                db.execute(f"DELETE FROM {table} WHERE place_id = ?", (ref,))
+            db.execute("DELETE FROM links WHERE owner_id = ?", (ref,))
+            db.execute("DELETE FROM timeline WHERE owner_id = ?", (ref,))
+            db.execute("DELETE FROM search WHERE ref = ?", (ref,))
+        db.execute("DELETE FROM places WHERE path = ?", (key,))
+
+    elif collection == 'maps':
+        for (ref,) in db.execute("SELECT id FROM maps WHERE path = ?", (key,)).fetchall():
+            db.execute("DELETE FROM map_places WHERE map_id = ?", (ref,))
+        db.execute("DELETE FROM maps WHERE path = ?", (key,))
+
+    elif collection == 'plans':
+        for (ref,) in db.execute("SELECT id FROM plans WHERE path = ?", (key,)).fetchall():
+            db.execute("DELETE FROM plan_steps WHERE plan_id = ?", (ref,))
+            db.execute("DELETE FROM plan_step_places WHERE plan_id = ?", (ref,))
+        db.execute("DELETE FROM plans WHERE path = ?", (key,))
+
+    db.execute("DELETE FROM files WHERE path = ?", (key,))
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+class SQLiteBuilder:
+    """Build or incrementally update the SQLite database"""
+
+    def __init__(self, database: Path, data_dir: Path = DATA_DIR):
+        self.database = Path(database)
+        self.data_dir = Path(data_dir)
+
+    def log(self, message: str):
+        print(f"[SQLITE] {message}")
+
+    def connect(self, rebuild: bool) -> sqlite3.Connection:
+        if rebuild and self.database.exists():
+            self.database.unlink()
+
+        self.database.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.database)
+
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            if version:
+                # Old schema: start over
+                db.close()
+                self.database.unlink()
+                db = sqlite3.connect(self.database)
+            self.log("Creating schema")
+            db.executescript(SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        return db
+
+    def run(self, rebuild: bool = False) -> Dict[str, int]:
+        db = self.connect(rebuild)
+        stats = {'loaded': 0, 'deleted': 0, 'unchanged': 0}
+
+        try:
+            known = {
+                path: (collection, signature)
+                for path, collection, signature in db.execute("SELECT path, collection, signature FROM files")
+            }
+            seen = set()
+
+            with db:
+                # Provinces and people first so references resolve in order
+                for collection in COLLECTIONS:
+                    loader = LOADERS[collection]
+                    for path in iter_paths(collection, self.data_dir):
+                        key = relative_key(path, self.data_dir)
+                        signature = json.dumps(file_signature(path))
+                        seen.add(key)
+
+                        if key in known and known[key][1] == signature:
+                            stats['unchanged'] += 1
+                            continue
+
+                        if key in known:
+                            delete_path(db, collection, key)
+
+                        doc = load_json(path)
+                        loader(db, key, composite_id(collection, path, doc), doc)
+                        db.execute(
+                            "INSERT INTO files (path, collection, signature) VALUES (?, ?, ?)",
+                            (key, collection, signature)
+                        )
+                        stats['loaded'] += 1
+
+                for key, (collection, _) in known.items():
+                    if key not in seen:
+                        delete_path(db, collection, key)
+                        stats['deleted'] += 1
+
+            if stats['loaded'] or stats['deleted']:
+                db.execute("INSERT INTO search(search) VALUES ('optimize')")
+                db.commit()
+        finally:
+            db.close()
+
+        self.log(f"Loaded {stats['loaded']} files, removed {stats['deleted']}, "
+                 f"{stats['unchanged']} unchanged")
+        return stats
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build a SQLite database (with R*Tree and FTS5) from the Mrrakc data'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=BUILD_DIR / 'mrrakc.sqlite',
+        help='SQLite database file (default: build/mrrakc.sqlite)'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '-f', '--rebuild',
+        action='store_true',
+        help='Drop the database and rebuild from scratch'
+    )
+
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    try:
+        SQLiteBuilder(args.output, args.data_dir).run(rebuild=args.rebuild)
+        print(f"\n✓ Success! Database saved to: {args.output}\n")
+    except sqlite3.OperationalError as e:
+        # Most likely a SQLite build without FTS5 or R*Tree
+        print(f"\n✗ SQLite error: {e}\n")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\n✗ Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Canonical JSON
+One byte-exact serialization for every data file, so re-saving a record
+only changes the lines whose values changed:
+
+    python3 scripts/canonical.py reformat            # rewrite data/ in place
+    python3 scripts/canonical.py reformat --check    # list files that would change
+    python3 scripts/canonical.py verify              # output must not depend on key order
+
+The canonical form is:
+
+- keys in schema order (schema/<collection>.json, following $ref and
+  allOf), with the shared envelope as version, kind, metadata, spec; keys
+  the schema does not know stay after the key they followed
+- coordinates rounded like NormalizeStage.normalize_coordinates (6 decimals
+  for latitude/longitude, 2 for altitude)
+- set-like lists (activities, items) sorted
+- 2-space indentation, UTF-8 without escapes, and a final newline
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from corpus import COLLECTIONS, DATA_DIR, SCHEMA_DIR, collection_of, iter_paths, load_json
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Top-level keys shared by every collection, as most files already have them
+ENVELOPE_KEYS = ['version', 'kind', 'metadata', 'spec']
+
+# Decimal places per numeric field (see NormalizeStage.normalize_coordinates)
+PRECISION = {
+    'longitude': 6,
+    'latitude': 6,
+    'altitude': 2,
+}
+
+# Lists whose order carries no meaning
+SET_FIELDS = {'activities', 'items'}
+
+INDENT = 2
+
+# Keywords that give a subschema keys of its own, besides a $ref
+STRUCTURE_KEYWORDS = {'properties', 'allOf', 'items'}
+
+
+# ============================================================================
+# KEY ORDER
+# ============================================================================
+
+class KeyOrder:
+    """Property order of an object schema, with the orders of its children"""
+
+    __slots__ = ('index', 'properties', 'items')
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.properties: Dict[str, 'KeyOrder'] = {}
+        self.items: Optional['KeyOrder'] = None
+
+    def add(self, key: str, child: Optional['KeyOrder']):
+        if key not in self.index:
+            self.index[key] = len(self.index)
+        if child is not None and key not in self.properties:
+            self.properties[key] = child
+
+    def sort(self, keys: List[str]) -> List[str]:
+        """
+        Known keys in schema order; unknown keys keep following the key
+        that preceded them in the original document
+        """
+        leading: List[str] = []
+        trailing: Dict[str, List[str]] = {}
+        anchor = None
+        for key in keys:
+            if key in self.index:
+                anchor = key
+                trailing.setdefault(key, [])
+            elif anchor is None:
+                leading.append(key)
+            else:
+                trailing[anchor].append(key)
+
+        ordered = list(leading)
+        for key in sorted(trailing, key=self.index.__getitem__):
+            ordered.append(key)
+            ordered.extend(trailing[key])
+        return ordered
+
+
+class SchemaOrders:
+    """Build KeyOrder trees from the JSON schemas, resolving $ref and allOf"""
+
+    def __init__(self, schema_dir: Path = SCHEMA_DIR):
+        self.schema_dir = Path(schema_dir)
+        self.documents: Dict[Path, Dict[str, Any]] = {}
+        self.resolved: Dict[Tuple[Path, str], KeyOrder] = {}
+
+    def document(self, path: Path) -> Dict[str, Any]:
+        path = path.resolve()
+        if path not in self.documents:
+            self.documents[path] = load_json(path)
+        return self.documents[path]
+
+    def collection(self, collection: str) -> KeyOrder:
+        root = KeyOrder()
+        for key in ENVELOPE_KEYS:
+            root.add(key, None)
+
+        path = self.schema_dir / f"{collection}.json"
+        if path.exists():
+            merge(root, self.ref(path, ''))
+        return root
+
+    def ref(self, path: Path, pointer: str) -> KeyOrder:
+        """
+        KeyOrder of the schema at path#pointer
+
+        Memoized before it is filled, so a recursive definition (plan steps
+        and their subSteps) resolves to this same node at every depth.
+        """
+        key = (path.resolve(), pointer)
+        if key in self.resolved:
+            return self.resolved[key]
+
+        node = KeyOrder()
+        self.resolved[key] = node
+
+        schema = self.document(path)
+        for part in [p for p in pointer.split('/') if p]:
+            schema = schema.get(part, {})
+        self.fill(node, schema, path)
+        return node
+
+    def build(self, schema: Dict[str, Any], path: Path) -> KeyOrder:
+        """KeyOrder of a subschema; a bare $ref returns the referenced node itself"""
+        if isinstance(schema, dict) and '$ref' in schema and not STRUCTURE_KEYWORDS & schema.keys():
+            return self.ref(*self.target(schema['$ref'], path))
+        node = KeyOrder()
+        self.fill(node, schema, path)
+        return node
+
+    def target(self, ref: str, path: Path) -> Tuple[Path, str]:
+        target, _, pointer = ref.partition('#')
+        return (path.parent / target) if target else path, pointer
+
+    def fill(self, node: KeyOrder, schema: Dict[str, Any], path: Path):
+        if not isinstance(schema, dict):
+            return
+
+        if '$ref' in schema:
+            # Combined with local keywords: the keys have to be copied. Only
+            # bare $refs (handled by build) may be recursive in these schemas.
+            merge(node, self.ref(*self.target(schema['$ref'], path)))
+
+        for key, child in schema.get('properties', {}).items():
+            node.add(key, self.build(child, path))
+
+        for sub in schema.get('allOf', []):
+            self.fill(node, sub, path)
+
+        if isinstance(schema.get('items'), dict):
+            items = self.build(schema['items'], path)
+            if node.items is None:
+                node.items = items
+            elif node.items is not items:
+                merge(node.items, items)
+
+
+def merge(node: KeyOrder, other: KeyOrder):
+    """Append the keys (and child orders) of other to node"""
+    for key in other.index:
+        node.add(key, other.properties.get(key))
+    if other.items is not None and node.items is None:
+        node.items = other.items
+
+
+# ============================================================================
+# SERIALIZER
+# ============================================================================
+
+def canonical_value(value: Any, order: Optional[KeyOrder], key: Optional[str] = None) -> Any:
+    if isinstance(value, dict):
+        keys = order.sort(list(value)) if order is not None else list(value)
+        return {
+            k: canonical_value(value[k], order.properties.get(k) if order is not None else None, k)
+            for k in keys
+        }
+
+    if isinstance(value, list):
+        items = [canonical_value(v, order.items if order is not None else None) for v in value]
+        if key in SET_FIELDS and all(isinstance(v, str) for v in items):
+            items.sort()
+        return items
+
+    if key in PRECISION and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(float(value), PRECISION[key])
+
+    return value
+
+
+class CanonicalWriter:
+    """Serialize data documents in canonical form"""
+
+    def __init__(self, schema_dir: Path = SCHEMA_DIR):
+        schemas = SchemaOrders(schema_dir)
+        self.orders = {collection: schemas.collection(collection) for collection in COLLECTIONS}
+
+    def canonical(self, doc: Dict[str, Any], collection: str) -> Dict[str, Any]:
+        return canonical_value(doc, self.orders.get(collection))
+
+    def dumps(self, doc: Dict[str, Any], collection: str) -> str:
+        return json.dumps(self.canonical(doc, collection), indent=INDENT, ensure_ascii=False) + '\n'
+
+    def write(self, path: Path, doc: Dict[str, Any], collection: str) -> bool:
+        """Write doc to path unless the file already holds these exact bytes"""
+        data = self.dumps(doc, collection).encode('utf-8')
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+        except FileNotFoundError:
+            pass
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+
+
+# ============================================================================
+# REFORMAT
+# ============================================================================
+
+# One writer per worker process, built by init_worker
+_writer: Optional[CanonicalWriter] = None
+
+
+def init_worker(schema_dir: Path):
+    global _writer
+    _writer = CanonicalWriter(schema_dir)
+
+
+def reformat_batch(batch: List[Tuple[str, str]], check: bool) -> List[Tuple[str, Optional[str]]]:
+    """(path, collection) pairs -> (path, error) for every file that changed or failed"""
+    results = []
+    for path, collection in batch:
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = _writer.dumps(json.loads(raw), collection).encode('utf-8')
+        except (OSError, ValueError) as e:
+            results.append((path, str(e)))
+            continue
+        if data != raw:
+            if not check:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            results.append((path, None))
+    return results
+
+
+def reformat(files: List[Tuple[Path, str]], schema_dir: Path, check: bool,
+             jobs: Optional[int]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Reformat files in parallel; returns (changed paths, (path, error) failures)"""
+    jobs = jobs or os.cpu_count() or 1
+    # A few batches per worker keeps the pool busy without per-file overhead
+    size = max(1, len(files) // (jobs * 4) + 1)
+    batches = [[(str(p), c) for p, c in files[i:i + size]] for i in range(0, len(files), size)]
+
+    changed, failed = [], []
+    if jobs == 1 or len(batches) == 1:
+        init_worker(schema_dir)
+        results = [reformat_batch(batch, check) for batch in batches]
+    else:
+        with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(schema_dir,)) as pool:
+            results = list(pool.map(reformat_batch, batches, [check] * len(batches)))
+
+    for batch in results:
+        for path, error in batch:
+            if error is None:
+                changed.append(path)
+            else:
+                failed.append((path, error))
+    return changed, failed
+
+
+# ============================================================================
+# VERIFY
+# ============================================================================
+
+def reversed_keys(value: Any, order: Optional[KeyOrder] = None) -> Any:
+    """
+    value with the keys of every object in reverse order
+
+    With an order, only schema-known keys move: unknown keys stay right
+    after the key they followed, as KeyOrder.sort keeps them there.
+    """
+    if order is None:
+        if isinstance(value, dict):
+            return {k: reversed_keys(value[k]) for k in reversed(list(value))}
+        if isinstance(value, list):
+            return [reversed_keys(v) for v in value]
+        return value
+
+    if isinstance(value, dict):
+        groups: List[List[str]] = []
+        for key in value:
+            if key in order.index or not groups:
+                groups.append([key])
+            else:
+                groups[-1].append(key)
+        leading = groups.pop(0) if groups and groups[0][0] not in order.index else []
+        keys = leading + [key for group in reversed(groups) for key in group]
+        # Below an object the schema does not describe, nothing moves
+        return {k: reversed_keys(value[k], order.properties.get(k, KeyOrder())) for k in keys}
+    if isinstance(value, list):
+        return [reversed_keys(v, order.items or KeyOrder()) for v in value]
+    return value
+
+
+def nested_plan(depth: int = 3) -> Dict[str, Any]:
+    """A plan whose steps nest subSteps `depth` levels deep (deeper than the data)"""
+    step: Dict[str, Any] = {'title': f"Step {depth}", 'type': 'waypoint'}
+    for level in range(depth - 1, -1, -1):
+        step = {
+            'subSteps': [step],
+            'transportToNext': {'advice': 'Early', 'durationMin': 10, 'mode': 'Walking'},
+            'optional': False,
+            'placeIds': ['places/casablanca/rialto-cinema'],
+            'type': 'activity',
+            'title': f"Step {level}",
+        }
+    return {
+        'version': 'mrrakc/v0',
+        'kind': 'plan',
+        'metadata': {'name': 'nested'},
+        'spec': {'id': 'nested', 'title': 'Nested', 'steps': [step]},
+    }
+
+
+def verify(writer: CanonicalWriter, files: List[Tuple[Path, str]]) -> List[str]:
+    """
+    Labels of documents whose canonical form depends on their key order:
+    each document is serialized as is and with reversed keys. Data files
+    may hold keys the schema does not know, so only their known keys are
+    reversed; the nested plan only has schema keys and is fully reversed,
+    which catches orders missing below recursive definitions.
+    """
+    documents = [
+        (str(path), doc, collection, reversed_keys(doc, writer.orders.get(collection) or KeyOrder()))
+        for path, collection in files
+        for doc in [load_json(path)]
+    ]
+    plan = nested_plan()
+    documents.append(('<nested plan>', plan, 'plans', reversed_keys(plan)))
+    return [
+        label for label, doc, collection, shuffled in documents
+        if writer.dumps(doc, collection) != writer.dumps(shuffled, collection)
+    ]
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write Mrrakc data files in canonical JSON form'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '--schema-dir',
+        type=Path,
+        default=SCHEMA_DIR,
+        help='Schema directory (default: schema/)'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    reformat_parser = subparsers.add_parser('reformat', help='Rewrite data files in canonical form')
+    reformat_parser.add_argument('paths', nargs='*', type=Path,
+                                 help='Files to reformat (default: every data file)')
+    reformat_parser.add_argument('--check', action='store_true',
+                                 help='Only list files that are not canonical (exit 1 if any)')
+    reformat_parser.add_argument('-j', '--jobs', type=int, default=None,
+                                 help='Worker processes (default: CPU count)')
+
+    verify_parser = subparsers.add_parser(
+        'verify', help='Check that the canonical form does not depend on key order'
+    )
+    verify_parser.add_argument('paths', nargs='*', type=Path,
+                               help='Files to check (default: every data file)')
+
+    args = parser.parse_args()
+
+    data_dir = args.data_dir.resolve()
+    if args.paths:
+        files = []
+        for path in args.paths:
+            collection = collection_of(path, data_dir)
+            if collection is None:
+                print(f"Error: Not a data file: {path}")
+                sys.exit(1)
+            files.append((path, collection))
+    else:
+        files = [(path, collection) for collection in COLLECTIONS
+                 for path in iter_paths(collection, data_dir)]
+
+    if args.command == 'verify':
+        start = time.perf_counter()
+        unstable = verify(CanonicalWriter(args.schema_dir), files)
+        for label in unstable:
+            print(f"  ✗ {label}: output depends on key order")
+        print(f"[CANONICAL] {len(files) + 1} documents, {len(unstable)} unstable "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        if unstable:
+            sys.exit(1)
+        return
+
+    start = time.perf_counter()
+    changed, failed = reformat(files, args.schema_dir, args.check, args.jobs)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for path in changed:
+        print(f"  {'!' if args.check else '✓'} {Path(path).resolve().relative_to(data_dir)}")
+    for path, error in failed:
+        print(f"  ✗ {path}: {error}")
+
+    verb = 'not canonical' if args.check else 'rewritten'
+    print(f"[CANONICAL] {len(files)} files, {len(changed)} {verb}, "
+          f"{len(failed)} failed in {elapsed:.1f} ms")
+
+    if failed or (args.check and changed):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
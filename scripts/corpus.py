@@ -0,0 +1,384 @@
+"""
+Mrrakc Corpus Helpers
+Shared helpers for scripts that read the whole data/ tree
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / 'data'
+SCHEMA_DIR = ROOT_DIR / 'schema'
+CACHE_DIR = ROOT_DIR / '.cache'
+BUILD_DIR = ROOT_DIR / 'build'
+
+# Collection name -> glob relative to the data directory
+COLLECTIONS = {
+    'provinces': 'provinces/*.json',
+    'people': 'people/*.json',
+    'places': 'places/*/*.json',
+    'maps': 'maps/*.json',
+    'plans': 'plans/*.json',
+}
+
+
+# ============================================================================
+# FILES
+# ============================================================================
+
+def iter_paths(collection: str, data_dir: Path = DATA_DIR) -> Iterator[Path]:
+    """Yield the files of a collection in a stable order"""
+    if collection not in COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection}")
+    yield from sorted(Path(data_dir).glob(COLLECTIONS[collection]))
+
+
+def collection_of(path: Path, data_dir: Path = DATA_DIR) -> Optional[str]:
+    """Return the collection a data file belongs to, or None"""
+    try:
+        rel = Path(path).resolve().relative_to(Path(data_dir).resolve())
+    except ValueError:
+        return None
+    if rel.suffix != '.json':
+        return None
+    for collection, pattern in COLLECTIONS.items():
+        if rel.match(pattern):
+            return collection
+    return None
+
+
+def file_signature(path: Path) -> List[int]:
+    """Cheap change detector: [mtime_ns, size]"""
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_json(path: Path) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def relative_key(path: Path, data_dir: Path = DATA_DIR) -> str:
+    """Data-relative POSIX path used as a cache key (e.g. places/casablanca/x.json)"""
+    try:
+        # Paths from iter_paths are already under data_dir: skip resolve()
+        return Path(path).relative_to(data_dir).as_posix()
+    except ValueError:
+        return Path(path).resolve().relative_to(Path(data_dir).resolve()).as_posix()
+
+
+# ============================================================================
+# IDENTIFIERS
+# ============================================================================
+
+def composite_id(collection: str, path: Path, doc: Dict[str, Any]) -> str:
+    """
+    Build the reference used across the dataset for a record
+
+    - provinces: province/<id>
+    - people:    people/<id>
+    - places:    places/<province-dir>/<id>
+    - maps:      maps/<id>
+    - plans:     plans/<id>
+
+    Like web/scripts/build_maps.ts, the file name is the identity; spec.id
+    can disagree with it (and is not unique across provinces).
+    """
+    record_id = Path(path).stem
+
+    if collection == 'provinces':
+        return f"province/{record_id}"
+    if collection == 'places':
+        return f"places/{Path(path).parent.name}/{record_id}"
+    return f"{collection}/{record_id}"
+
+
+def place_ref(ref: str) -> str:
+    """Normalize a place reference: maps and some plans omit the places/ prefix"""
+    return ref if ref.startswith('places/') else f"places/{ref}"
+
+
+def split_ref(ref: str) -> Tuple[str, str]:
+    """Split a reference like 'people/henri-prost' into ('people', 'henri-prost')"""
+    prefix, _, rest = ref.partition('/')
+    return prefix, rest
+
+
+# ============================================================================
+# GEOMETRY
+# ============================================================================
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def load_provinces(data_dir: Path = DATA_DIR) -> Dict[str, Dict[str, Any]]:
+    """Map province/<id> -> spec"""
+    provinces = {}
+    for path in iter_paths('provinces', data_dir):
+        doc = load_json(path)
+        provinces[composite_id('provinces', path, doc)] = doc.get('spec', {})
+    return provinces
+
+
+def load_people(data_dir: Path = DATA_DIR) -> Dict[str, Dict[str, Any]]:
+    """Map people/<id> -> spec"""
+    people = {}
+    for path in iter_paths('people', data_dir):
+        doc = load_json(path)
+        people[composite_id('people', path, doc)] = doc.get('spec', {})
+    return people
+
+
+def collection_signature(collections: List[str], data_dir: Path = DATA_DIR) -> str:
+    """Combined signature of every file in the given collections"""
+    import hashlib
+
+    digest = hashlib.sha1()
+    for collection in collections:
+        for path in iter_paths(collection, data_dir):
+            digest.update(relative_key(path, data_dir).encode('utf-8'))
+            digest.update(repr(file_signature(path)).encode('ascii'))
+    return digest.hexdigest()
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class FileCache:
+    """
+    Per-file cache of derived values, persisted as a single JSON file
+
+    Entries are keyed by data-relative path and carry the file signature
+    they were computed from; a changed signature is a cache miss. A tag
+    (e.g. a signature of the files the values depend on) invalidates every
+    entry at once when it changes.
+    """
+
+    VERSION = 1
+
+    def __init__(self, name: str, tag: str = '', cache_dir: Path = CACHE_DIR):
+        self.path = Path(cache_dir) / f"{name}.json"
+        self.tag = tag
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        if self.path.exists():
+            try:
+                cached = load_json(self.path)
+            except (OSError, ValueError):
+                cached = {}
+            if cached.get('version') == self.VERSION and cached.get('tag') == tag:
+                self.entries = cached.get('entries', {})
+
+    def get(self, key: str, signature: List[int]) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is not None and entry.get('sig') == signature:
+            self.hits += 1
+            return entry.get('value')
+        self.misses += 1
+        return None
+
+    def put(self, key: str, signature: List[int], value: Any):
+        self.entries[key] = {'sig': signature, 'value': value}
+        self.dirty = True
+
+    def prune(self, keep: set):
+        """Drop entries for files that no longer exist"""
+        stale = [key for key in self.entries if key not in keep]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        # dumps() runs the C encoder in one go, dump() streams through Python
+        data = json.dumps({'version': self.VERSION, 'tag': self.tag, 'entries': self.entries},
+                          ensure_ascii=False, separators=(',', ':'))
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+# ============================================================================
+# WATCHING
+# ============================================================================
+
+class FileWatcher:
+    """
+    Report batches of changed files under a set of directories
+
+    Uses inotify on Linux (through ctypes, no extra dependency) and falls
+    back to polling file signatures elsewhere. Events are debounced so an
+    editor's write-rename-chmod sequence arrives as one batch.
+    """
+
+    # inotify event masks (from <sys/inotify.h>)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    def __init__(self, roots: List[Path], suffixes: Tuple[str, ...] = ('.json',),
+                 interval: float = 0.5, debounce: float = 0.05, polling: bool = False):
+        self.roots = [Path(root).resolve() for root in roots]
+        self.suffixes = suffixes
+        self.interval = interval
+        self.debounce = debounce
+        self.fd = None
+        self.watches: Dict[int, Path] = {}
+
+        if not polling:
+            self.fd = self.init_inotify()
+        self.mode = 'inotify' if self.fd is not None else 'polling'
+
+        if self.fd is not None:
+            for root in self.roots:
+                self.add_tree(root)
+        else:
+            self.snapshot = self.scan()
+
+    def relevant(self, path: Path) -> bool:
+        return path.suffix in self.suffixes
+
+    # ------------------------------------------------------------------------
+    # inotify
+    # ------------------------------------------------------------------------
+
+    def init_inotify(self) -> Optional[int]:
+        import sys
+
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            import ctypes
+            import ctypes.util
+
+            self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return fd if fd >= 0 else None
+
+    def add_tree(self, root: Path):
+        mask = (self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO
+                | self.IN_CREATE | self.IN_DELETE)
+        for directory in [root, *(p for p in root.rglob('*') if p.is_dir())]:
+            wd = self.libc.inotify_add_watch(self.fd, str(directory).encode(), mask)
+            if wd >= 0:
+                self.watches[wd] = directory
+
+    def read_inotify(self, timeout: Optional[float]) -> set:
+        import select
+        import struct
+
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed
+
+        header = struct.Struct('iIII')
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = header.unpack_from(data, offset)
+                offset += header.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+                offset += length
+
+                directory = self.watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / name
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        self.add_tree(path)
+                        changed.update(p for p in path.rglob('*') if self.relevant(p))
+                elif self.relevant(path):
+                    changed.add(path)
+        return changed
+
+    # ------------------------------------------------------------------------
+    # polling
+    # ------------------------------------------------------------------------
+
+    def scan(self) -> Dict[Path, List[int]]:
+        snapshot = {}
+        for root in self.roots:
+            for path in root.rglob('*'):
+                if self.relevant(path):
+                    try:
+                        snapshot[path] = file_signature(path)
+                    except OSError:
+                        pass
+        return snapshot
+
+    def poll(self) -> set:
+        current = self.scan()
+        changed = {p for p, sig in current.items() if self.snapshot.get(p) != sig}
+        changed.update(p for p in self.snapshot if p not in current)
+        self.snapshot = current
+        return changed
+
+    # ------------------------------------------------------------------------
+
+    def changes(self) -> Iterator[set]:
+        """Yield sets of changed (created, modified or deleted) paths, forever"""
+        import time
+
+        while True:
+            if self.fd is not None:
+                changed = self.read_inotify(None)
+                # Debounce: keep collecting until the burst is over
+                while changed:
+                    more = self.read_inotify(self.debounce)
+                    if not more:
+                        break
+                    changed |= more
+            else:
+                time.sleep(self.interval)
+                changed = self.poll()
+
+            if changed:
+                yield changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Corpus Diff
+Semantic change feed between two revisions of the data tree:
+
+    python3 scripts/diff_corpus.py HEAD~1 HEAD
+    python3 scripts/diff_corpus.py origin/main:data data
+    python3 scripts/diff_corpus.py /tmp/old-data data --collection places
+
+A snapshot is a directory, or a git tree read with plain git plumbing
+(`rev:path`, or a bare revision meaning `rev:data`). Records are matched
+by collection and spec.id, so a place moved to another province directory
+is one change, not a removal and an addition. Files whose git blob hash is
+identical on both sides are skipped without being parsed.
+
+Each added, removed or changed record is printed as one NDJSON line with
+field-level changes, e.g. moved coordinates, province reassignment or
+timeline events added.
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from corpus import COLLECTIONS, DATA_DIR, ROOT_DIR, haversine_km
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Lists compared as sets of values
+SET_FIELDS = {'activities', 'items', 'tags', 'timePeriods', 'designations', 'relationship', 'comments'}
+
+# Lists of objects matched element by element on these keys
+LIST_KEYS = {
+    'timeline': ('date', 'title'),
+    'links': ('url',),
+    'people': ('id',),
+    'steps': ('title',),
+    'options': ('title', 'audience'),
+}
+
+
+# ============================================================================
+# SNAPSHOTS
+# ============================================================================
+
+def blob_hash(data: bytes) -> str:
+    """Git blob id of some bytes, so directories and git trees compare directly"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def file_collection(path: str) -> Optional[str]:
+    for collection, pattern in COLLECTIONS.items():
+        if PurePosixPath(path).match(pattern):
+            return collection
+    return None
+
+
+class Snapshot(ABC):
+    """Data files of one revision: path -> blob hash, with lazy content loading"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.hashes: Dict[str, str] = {}
+
+    @abstractmethod
+    def load(self, paths: List[str]) -> Dict[str, bytes]:
+        """Contents of the given paths"""
+        pass
+
+
+class DirectorySnapshot(Snapshot):
+    def __init__(self, directory: Path):
+        super().__init__(str(directory))
+        self.directory = Path(directory)
+        self.contents: Dict[str, bytes] = {}
+
+        for collection, pattern in COLLECTIONS.items():
+            for path in sorted(self.directory.glob(pattern)):
+                key = path.relative_to(self.directory).as_posix()
+                data = path.read_bytes()
+                self.contents[key] = data
+                self.hashes[key] = blob_hash(data)
+
+    def load(self, paths: List[str]) -> Dict[str, bytes]:
+        return {path: self.contents[path] for path in paths}
+
+
+class GitSnapshot(Snapshot):
+    """A tree read with `git ls-tree` and `git cat-file --batch`"""
+
+    def __init__(self, treeish: str, repo: Path = ROOT_DIR):
+        super().__init__(treeish)
+        self.repo = Path(repo)
+
+        output = self.git('ls-tree', '-r', '-z', '--full-tree', treeish)
+        for entry in output.split(b'\0'):
+            if not entry:
+                continue
+            meta, _, path = entry.partition(b'\t')
+            _, kind, sha = meta.split()
+            path = path.decode('utf-8')
+            if kind == b'blob' and file_collection(path):
+                self.hashes[path] = sha.decode('ascii')
+
+    def git(self, *args: str, input: Optional[bytes] = None) -> bytes:
+        try:
+            result = subprocess.run(['git', '-C', str(self.repo), *args], input=input,
+                                    capture_output=True, check=True)
+        except FileNotFoundError:
+            raise ValueError("git is not installed")
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"git {args[0]} failed: {e.stderr.decode('utf-8', 'replace').strip()}")
+        return result.stdout
+
+    def load(self, paths: List[str]) -> Dict[str, bytes]:
+        """Read all requested blobs through a single cat-file process"""
+        if not paths:
+            return {}
+        output = self.git('cat-file', '--batch',
+                          input=''.join(f"{self.hashes[p]}\n" for p in paths).encode('ascii'))
+
+        contents = {}
+        offset = 0
+        for path in paths:
+            header_end = output.index(b'\n', offset)
+            _, _, size = output[offset:header_end].split()
+            start = header_end + 1
+            contents[path] = output[start:start + int(size)]
+            offset = start + int(size) + 1
+        return contents
+
+
+def open_snapshot(spec: str, repo: Path = ROOT_DIR) -> Snapshot:
+    """Directory if spec is one, else `rev:path` or a revision (meaning rev:data)"""
+    if Path(spec).is_dir():
+        return DirectorySnapshot(Path(spec))
+    if ':' not in spec:
+        spec = f"{spec}:{DATA_DIR.relative_to(ROOT_DIR).as_posix()}"
+    return GitSnapshot(spec, repo)
+
+
+# ============================================================================
+# DIFF
+# ============================================================================
+
+def element_key(field: str, value: Any) -> Any:
+    keys = LIST_KEYS.get(field)
+    if keys and isinstance(value, dict):
+        return tuple(value.get(k) for k in keys)
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def diff_values(old: Any, new: Any, path: str, field: str) -> Iterator[Dict[str, Any]]:
+    """Field-level changes between two JSON values"""
+    if old == new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(old) + [k for k in new if k not in old]:
+            sub = f"{path}.{key}"
+            if key not in new:
+                yield {'path': sub, 'change': 'removed', 'from': old[key]}
+            elif key not in old:
+                yield {'path': sub, 'change': 'added', 'to': new[key]}
+            else:
+                yield from diff_values(old[key], new[key], sub, key)
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        if field in SET_FIELDS or field in LIST_KEYS:
+            old_items = {element_key(field, v): v for v in old}
+            new_items = {element_key(field, v): v for v in new}
+            for key, value in new_items.items():
+                if key not in old_items:
+                    yield {'path': path, 'change': 'added', 'to': value}
+                elif old_items[key] != value:
+                    # Same element, edited in place (e.g. a link title)
+                    yield from diff_values(old_items[key], value, f"{path}[{element_label(key)}]", '')
+            for key, value in old_items.items():
+                if key not in new_items:
+                    yield {'path': path, 'change': 'removed', 'from': value}
+            return
+
+    yield {'path': path, 'change': 'changed', 'from': old, 'to': new}
+
+
+def element_label(key: Any) -> str:
+    return '/'.join(str(part) for part in key) if isinstance(key, tuple) else str(key)
+
+
+def diff_records(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Field-level changes, with location changes reported semantically:
+    coordinates as one 'moved' change with its distance, the province as
+    'reassigned'
+    """
+    old_location = old.get('spec', {}).get('location', {})
+    new_location = new.get('spec', {}).get('location', {})
+    changes = []
+
+    old_point = (old_location.get('latitude'), old_location.get('longitude'))
+    new_point = (new_location.get('latitude'), new_location.get('longitude'))
+    if old_point != new_point:
+        change = {'path': 'spec.location', 'change': 'moved', 'from': list(old_point), 'to': list(new_point)}
+        if None not in old_point and None not in new_point:
+            change['distanceKm'] = round(haversine_km(*old_point, *new_point), 3)
+        changes.append(change)
+
+    if old_location.get('province') != new_location.get('province'):
+        changes.append({'path': 'spec.location.province', 'change': 'reassigned',
+                        'from': old_location.get('province'), 'to': new_location.get('province')})
+
+    handled = {'spec.location.latitude', 'spec.location.longitude', 'spec.location.province'}
+    changes.extend(c for c in diff_values(old, new, '', '') if c['path'].lstrip('.') not in handled)
+    for change in changes:
+        change['path'] = change['path'].lstrip('.')
+    return changes
+
+
+def pair_records(removed: List[Tuple[str, Dict[str, Any]]],
+                 added: List[Tuple[str, Dict[str, Any]]]) -> Tuple[list, list, list]:
+    """
+    Match old and new records of one collection by spec.id
+
+    spec.id is not unique across province directories, so records with the
+    same id are paired by identical path first, then in path order.
+    """
+    by_id: Dict[Any, List[Tuple[str, Dict[str, Any]]]] = {}
+    for path, doc in removed:
+        by_id.setdefault(doc.get('spec', {}).get('id'), []).append((path, doc))
+
+    pairs, only_new = [], []
+    for path, doc in added:
+        candidates = by_id.get(doc.get('spec', {}).get('id'), [])
+        same_path = [c for c in candidates if c[0] == path]
+        match = same_path[0] if same_path else (candidates[0] if candidates else None)
+        if match is None:
+            only_new.append((path, doc))
+        else:
+            candidates.remove(match)
+            pairs.append((match, (path, doc)))
+
+    only_old = [record for records in by_id.values() for record in records]
+    return pairs, only_old, only_new
+
+
+class CorpusDiff:
+    """Compare two snapshots and yield change records"""
+
+    def __init__(self, old: Snapshot, new: Snapshot, collections: Optional[List[str]] = None):
+        self.old = old
+        self.new = new
+        self.collections = collections or list(COLLECTIONS)
+        self.stats = {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 0, 'skipped': 0}
+
+    def log(self, message: str):
+        print(f"[DIFF] {message}", file=sys.stderr)
+
+    def candidates(self, snapshot: Snapshot, other: Snapshot) -> Dict[str, List[str]]:
+        """Paths per collection that are not byte-identical in the other snapshot"""
+        paths: Dict[str, List[str]] = {c: [] for c in self.collections}
+        for path, sha in snapshot.hashes.items():
+            collection = file_collection(path)
+            if collection not in paths:
+                continue
+            if other.hashes.get(path) == sha:
+                continue
+            paths[collection].append(path)
+        return paths
+
+    def run(self) -> Iterator[Dict[str, Any]]:
+        old_paths = self.candidates(self.old, self.new)
+        new_paths = self.candidates(self.new, self.old)
+        self.stats['skipped'] = sum(
+            1 for path, sha in self.new.hashes.items()
+            if file_collection(path) in self.collections and self.old.hashes.get(path) == sha
+        )
+
+        old_contents = self.old.load(sorted(p for paths in old_paths.values() for p in paths))
+        new_contents = self.new.load(sorted(p for paths in new_paths.values() for p in paths))
+
+        for collection in self.collections:
+            removed = [(p, json.loads(old_contents[p])) for p in sorted(old_paths[collection])]
+            added = [(p, json.loads(new_contents[p])) for p in sorted(new_paths[collection])]
+            pairs, only_old, only_new = pair_records(removed, added)
+
+            for (old_path, old_doc), (new_path, new_doc) in pairs:
+                changes = diff_records(old_doc, new_doc)
+                if not changes and old_path == new_path:
+                    # Only formatting changed
+                    self.stats['unchanged'] += 1
+                    continue
+                self.stats['changed'] += 1
+                entry = self.entry('changed', collection, new_path, new_doc)
+                if old_path != new_path:
+                    entry['oldPath'] = old_path
+                entry['changes'] = changes
+                yield entry
+
+            for path, doc in only_old:
+                self.stats['removed'] += 1
+                yield self.entry('removed', collection, path, doc)
+
+            for path, doc in only_new:
+                self.stats['added'] += 1
+                entry = self.entry('added', collection, path, doc)
+                entry['record'] = doc
+                yield entry
+
+    def entry(self, op: str, collection: str, path: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'op': op,
+            'collection': collection,
+            'id': doc.get('spec', {}).get('id'),
+            'path': path,
+        }
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Print semantic changes between two revisions of Mrrakc data as NDJSON'
+    )
+
+    parser.add_argument('old', help='Old snapshot: directory, rev:path or revision')
+    parser.add_argument('new', help='New snapshot: directory, rev:path or revision')
+
+    parser.add_argument(
+        '-c', '--collection',
+        action='append',
+        choices=list(COLLECTIONS),
+        help='Only diff this collection (repeatable; default: all)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        help='Output file (default: stdout)'
+    )
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        differ = CorpusDiff(open_snapshot(args.old), open_snapshot(args.new), args.collection)
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for entry in differ.run():
+                out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        finally:
+            if args.output:
+                out.close()
+    except ValueError as e:
+        print(f"\n✗ Error: {e}\n", file=sys.stderr)
+        sys.exit(1)
+
+    stats = differ.stats
+    differ.log(f"{stats['added']} added, {stats['removed']} removed, {stats['changed']} changed, "
+               f"{stats['unchanged']} reformatted only, {stats['skipped']} identical "
+               f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
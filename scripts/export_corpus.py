@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Corpus Exporter
+Bundle every place, with its resolved province and people, into single files:
+
+- places.geojson  GeoJSON FeatureCollection
+- places.ndjson   one JSON record per line
+- places.parquet  columnar table (or places.csv when pyarrow is not installed)
+
+All outputs are written in one pass over the places. Serialized fragments
+are cached per file, so after a small edit only the changed files (and
+the places referring to a changed person or province) are re-read; if
+nothing changed the outputs are left untouched.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, List
+
+from corpus import (
+    BUILD_DIR, DATA_DIR, FileCache, composite_id, file_signature, iter_paths,
+    load_json, load_people, load_provinces, relative_key,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bump when the shape of the exported records changes
+EXPORT_FORMAT = 2
+
+COLUMNS = [
+    'id', 'kind', 'name', 'description', 'longitude', 'latitude', 'altitude',
+    'province', 'province_name', 'region', 'country', 'people',
+    'timePeriods', 'activities', 'items', 'links', 'timeline_events',
+]
+
+# Separator for list values flattened into a single column
+LIST_SEPARATOR = '|'
+
+
+# ============================================================================
+# RECORDS
+# ============================================================================
+
+def build_record(path: Path, doc: Dict[str, Any],
+                 provinces: Dict[str, Dict[str, Any]],
+                 people: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Build an export record with province and people references resolved"""
+    spec = doc.get('spec', {})
+    location = spec.get('location', {})
+    province_ref = location.get('province')
+    province = provinces.get(province_ref, {})
+
+    resolved_people = []
+    for entry in spec.get('people', []):
+        person = people.get(entry.get('id'), {})
+        resolved_people.append({
+            'id': entry.get('id'),
+            'name': person.get('name'),
+            'relationship': entry.get('relationship', []),
+            'designations': person.get('designations', []),
+        })
+
+    return {
+        'id': composite_id('places', path, doc),
+        'kind': doc.get('kind'),
+        'spec': spec,
+        'province': {
+            'id': province_ref,
+            'name': province.get('name'),
+            'region': province.get('region'),
+            'country': province.get('country'),
+        },
+        'people': resolved_people,
+    }
+
+
+def record_to_feature(record: Dict[str, Any]) -> Dict[str, Any]:
+    location = record['spec'].get('location', {})
+    coordinates = [location.get('longitude'), location.get('latitude')]
+    if location.get('altitude') is not None:
+        coordinates.append(location['altitude'])
+
+    return {
+        'type': 'Feature',
+        'id': record['id'],
+        'geometry': {'type': 'Point', 'coordinates': coordinates},
+        'properties': record,
+    }
+
+
+def record_to_row(record: Dict[str, Any]) -> List[Any]:
+    spec = record['spec']
+    location = spec.get('location', {})
+    province = record['province']
+
+    return [
+        record['id'],
+        record['kind'],
+        spec.get('name'),
+        spec.get('description'),
+        location.get('longitude'),
+        location.get('latitude'),
+        location.get('altitude'),
+        province['id'],
+        province['name'],
+        province['region'],
+        province['country'],
+        LIST_SEPARATOR.join(p['id'] for p in record['people'] if p.get('id')),
+        LIST_SEPARATOR.join(spec.get('timePeriods', [])),
+        LIST_SEPARATOR.join(spec.get('activities', [])),
+        LIST_SEPARATOR.join(spec.get('items', [])),
+        LIST_SEPARATOR.join(link.get('url', '') for link in spec.get('links', [])),
+        len(spec.get('timeline', [])),
+    ]
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+# ============================================================================
+# EXPORTER
+# ============================================================================
+
+class Exporter:
+    """Stream places into the bundle formats"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, output_dir: Path = BUILD_DIR / 'export'):
+        self.data_dir = Path(data_dir)
+        self.output_dir = Path(output_dir)
+
+        try:
+            import pyarrow  # noqa: F401
+            self.columnar = 'parquet'
+        except ImportError:
+            self.columnar = 'csv'
+
+        self.outputs = {
+            'geojson': self.output_dir / 'places.geojson',
+            'ndjson': self.output_dir / 'places.ndjson',
+            self.columnar: self.output_dir / f"places.{self.columnar}",
+        }
+
+        # Kept across runs so a long-lived exporter (validate.py --watch)
+        # does not reload the cache file on every change
+        self.cache = None
+
+    def log(self, message: str):
+        print(f"[EXPORT] {message}")
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        # Fragments embed resolved people/provinces: each one records the
+        # signatures of the files it was resolved against, so editing a
+        # person only re-reads the places that mention them
+        dependencies = {
+            composite_id(collection, path, {}): file_signature(path)
+            for collection in ['people', 'provinces']
+            for path in iter_paths(collection, self.data_dir)
+        }
+        if self.cache is None:
+            self.cache = FileCache('export', tag=str(EXPORT_FORMAT))
+        cache = self.cache
+
+        provinces = None
+        people = None
+
+        fragments = []
+        keys = set()
+        reread = 0
+
+        for path in iter_paths('places', self.data_dir):
+            key = relative_key(path, self.data_dir)
+            signature = file_signature(path)
+            keys.add(key)
+
+            fragment = None if force else cache.get(key, signature)
+            if fragment is not None and any(
+                dependencies.get(ref) != sig for ref, sig in fragment['deps'].items()
+            ):
+                fragment = None
+
+            if fragment is None:
+                # Lookups are only loaded when something actually changed
+                if provinces is None:
+                    provinces = load_provinces(self.data_dir)
+                    people = load_people(self.data_dir)
+                record = build_record(path, load_json(path), provinces, people)
+                refs = [record['province']['id']] + [p['id'] for p in record['people']]
+                fragment = {
+                    'feature': dumps(record_to_feature(record)),
+                    'line': dumps(record),
+                    'row': record_to_row(record),
+                    'deps': {ref: dependencies.get(ref) for ref in refs if ref},
+                }
+                cache.put(key, signature, fragment)
+                reread += 1
+
+            fragments.append(fragment)
+
+        cache.prune(keys)
+        up_to_date = not cache.dirty and all(p.exists() for p in self.outputs.values())
+
+        if up_to_date and not force:
+            self.log(f"Up to date ({len(fragments)} places)")
+        else:
+            self.log(f"Writing {len(fragments)} places "
+                     f"({reread} re-read, {len(fragments) - reread} cached)")
+            self.write(fragments)
+            cache.save()
+
+        return {'places': len(fragments), 'changed': reread, 'outputs': self.outputs}
+
+    def write(self, fragments: List[Dict[str, Any]]):
+        """Write every output in a single pass over the fragments"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = {name: path.with_name(path.name + '.tmp') for name, path in self.outputs.items()}
+
+        with open(tmp['geojson'], 'w', encoding='utf-8') as geojson, \
+             open(tmp['ndjson'], 'w', encoding='utf-8') as ndjson:
+            csv_file = None
+            writer = None
+            rows = []
+            if self.columnar == 'csv':
+                csv_file = open(tmp['csv'], 'w', encoding='utf-8', newline='')
+                writer = csv.writer(csv_file)
+                writer.writerow(COLUMNS)
+
+            try:
+                geojson.write('{"type":"FeatureCollection","features":[\n')
+                for i, fragment in enumerate(fragments):
+                    if i:
+                        geojson.write(',\n')
+                    geojson.write(fragment['feature'])
+                    ndjson.write(fragment['line'])
+                    ndjson.write('\n')
+                    if writer:
+                        writer.writerow(fragment['row'])
+                    else:
+                        rows.append(fragment['row'])
+                geojson.write('\n]}\n')
+            finally:
+                if csv_file:
+                    csv_file.close()
+
+        if self.columnar == 'parquet':
+            self.write_parquet(rows, tmp['parquet'])
+
+        for name, path in self.outputs.items():
+            os.replace(tmp[name], path)
+            self.log(f"Wrote {path}")
+
+    def write_parquet(self, rows: List[List[Any]], path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        columns = list(zip(*rows)) if rows else [[] for _ in COLUMNS]
+        table = pa.table({name: list(values) for name, values in zip(COLUMNS, columns)})
+        pq.write_table(table, path)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export all Mrrakc places as GeoJSON, NDJSON and Parquet/CSV bundles'
+    )
+
+    parser.add_argument(
+        '-o', '--output-dir',
+        type=Path,
+        default=BUILD_DIR / 'export',
+        help='Output directory (default: build/export)'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '-f', '--force',
+        action='store_true',
+        help='Ignore the cache and rewrite every output'
+    )
+
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    try:
+        result = Exporter(args.data_dir, args.output_dir).run(force=args.force)
+        print(f"\n✓ Success! Exported {result['places']} places to: {args.output_dir}\n")
+    except Exception as e:
+        print(f"\n✗ Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
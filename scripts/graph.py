@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Relationship Graph
+Places, people, provinces, maps and plans as one undirected graph stored
+as compact CSR adjacency arrays (offsets + targets), with traversal and
+co-occurrence queries:
+
+    python3 scripts/graph.py neighbors people/henri-prost
+    python3 scripts/graph.py path people/henri-prost people/albert-laprade
+    python3 scripts/graph.py nearby places/casablanca/rialto-cinema --km 2 --relationship architect
+    python3 scripts/graph.py people maps/casablanca-mohammed-v-walk
+
+Edges come from place.people, place.location.province, person.birthPlace,
+map content ids and plan steps. The graph is built in one pass over the
+corpus and cached in build/graph.bin until a data file changes.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from corpus import (
+    BUILD_DIR, COLLECTIONS, DATA_DIR, collection_signature, composite_id,
+    haversine_km, iter_paths, load_json, place_ref,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+GRAPH_FILE = BUILD_DIR / 'graph.bin'
+
+# Bump when the edge model or file layout changes
+GRAPH_VERSION = 2
+
+
+# ============================================================================
+# GRAPH
+# ============================================================================
+
+class Graph:
+    """
+    Undirected multigraph in CSR form
+
+    Node i's edges are targets[offsets[i]:offsets[i + 1]] with matching
+    labels[...] indices into the label table. Place coordinates live in
+    parallel lat/lon arrays (NaN for other nodes).
+    """
+
+    def __init__(self, nodes: List[str], labels: List[str], offsets: array,
+                 targets: array, edge_labels: array, lat: array, lon: array):
+        self.nodes = nodes
+        self.index = {ref: i for i, ref in enumerate(nodes)}
+        self.labels = labels
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_labels = edge_labels
+        self.lat = lat
+        self.lon = lon
+
+    @classmethod
+    def from_edges(cls, nodes: List[str], coordinates: Dict[str, Tuple[float, float]],
+                   edges: List[Tuple[str, str, str]]) -> 'Graph':
+        """Build CSR arrays from (a, b, label) edges; unknown references become nodes"""
+        index = {ref: i for i, ref in enumerate(nodes)}
+        for a, b, _ in edges:
+            for ref in (a, b):
+                if ref not in index:
+                    index[ref] = len(nodes)
+                    nodes.append(ref)
+
+        labels: List[str] = []
+        label_index: Dict[str, int] = {}
+
+        degree = [0] * len(nodes)
+        for a, b, _ in edges:
+            degree[index[a]] += 1
+            degree[index[b]] += 1
+
+        offsets = array('I', [0]) * (len(nodes) + 1)
+        for i, d in enumerate(degree):
+            offsets[i + 1] = offsets[i] + d
+
+        targets = array('I', [0]) * offsets[-1]
+        edge_labels = array('H', [0]) * offsets[-1]
+        cursor = list(offsets[:-1])
+
+        for a, b, label in edges:
+            if label not in label_index:
+                label_index[label] = len(labels)
+                labels.append(label)
+            lid = label_index[label]
+            ia, ib = index[a], index[b]
+            targets[cursor[ia]], edge_labels[cursor[ia]] = ib, lid
+            cursor[ia] += 1
+            targets[cursor[ib]], edge_labels[cursor[ib]] = ia, lid
+            cursor[ib] += 1
+
+        lat = array('d', [math.nan]) * len(nodes)
+        lon = array('d', [math.nan]) * len(nodes)
+        for ref, (node_lat, node_lon) in coordinates.items():
+            lat[index[ref]] = node_lat
+            lon[index[ref]] = node_lon
+
+        return cls(nodes, labels, offsets, targets, edge_labels, lat, lon)
+
+    # ------------------------------------------------------------------------
+    # Persistence: one JSON header line followed by the raw arrays
+    # ------------------------------------------------------------------------
+
+    def save(self, path: Path, signature: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = [self.offsets, self.targets, self.edge_labels, self.lat, self.lon]
+        header = {
+            'version': GRAPH_VERSION,
+            'signature': signature,
+            'nodes': self.nodes,
+            'labels': self.labels,
+            'lengths': [len(a) for a in arrays],
+        }
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8'))
+            f.write(b'\n')
+            for a in arrays:
+                a.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, signature: str) -> Optional['Graph']:
+        """Load a cached graph, or None if missing, stale or corrupt"""
+        if not path.exists():
+            return None
+        with open(path, 'rb') as f:
+            try:
+                header = json.loads(f.readline())
+                if not isinstance(header, dict):
+                    return None
+                if header.get('version') != GRAPH_VERSION or header.get('signature') != signature:
+                    return None
+                arrays = []
+                for typecode, length in zip('IIHdd', header['lengths']):
+                    a = array(typecode)
+                    a.fromfile(f, length)
+                    arrays.append(a)
+                return cls(header['nodes'], header['labels'], *arrays)
+            except (ValueError, EOFError, KeyError, TypeError):
+                # Truncated or corrupt file: rebuild
+                return None
+
+    # ------------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------------
+
+    def node(self, ref: str) -> int:
+        if ref not in self.index:
+            raise ValueError(f"Unknown reference: {ref}")
+        return self.index[ref]
+
+    def edges(self, i: int) -> List[Tuple[int, str]]:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return [(self.targets[k], self.labels[self.edge_labels[k]]) for k in range(start, end)]
+
+    def neighbors(self, ref: str, prefix: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(neighbor ref, edge label) pairs, optionally only refs starting with prefix"""
+        result = []
+        for j, label in self.edges(self.node(ref)):
+            if prefix is None or self.nodes[j].startswith(prefix):
+                result.append((self.nodes[j], label))
+        return result
+
+    def bfs(self, ref: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """Hop distance from ref to every reachable node"""
+        start = self.node(ref)
+        depth = {start: 0}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            if max_depth is not None and depth[i] >= max_depth:
+                continue
+            for k in range(self.offsets[i], self.offsets[i + 1]):
+                j = self.targets[k]
+                if j not in depth:
+                    depth[j] = depth[i] + 1
+                    queue.append(j)
+        return {self.nodes[i]: d for i, d in depth.items()}
+
+    def shortest_path(self, source: str, target: str,
+                      through_provinces: bool = False) -> Optional[List[str]]:
+        """
+        Fewest-hop path between two records
+
+        Province nodes connect hundreds of records, so they are not used as
+        stepping stones unless through_provinces is set.
+        """
+        start, goal = self.node(source), self.node(target)
+        parent = {start: -1}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            if i == goal:
+                path = []
+                while i != -1:
+                    path.append(self.nodes[i])
+                    i = parent[i]
+                return path[::-1]
+            if i != start and not through_provinces and self.nodes[i].startswith('province/'):
+                continue
+            for k in range(self.offsets[i], self.offsets[i + 1]):
+                j = self.targets[k]
+                if j not in parent:
+                    parent[j] = i
+                    queue.append(j)
+        return None
+
+    def distance_km(self, i: int, j: int) -> float:
+        return haversine_km(self.lat[i], self.lon[i], self.lat[j], self.lon[j])
+
+    def nearby_by_same_people(self, place: str, km: float = 2.0,
+                              relationship: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Other places sharing a person with this place, within km
+
+        e.g. other buildings by the same architect within 2 km. relationship
+        filters the place<->person edges (case-insensitive substring).
+        """
+        i = self.node(place)
+        if math.isnan(self.lat[i]):
+            raise ValueError(f"No coordinates for: {place}")
+
+        def matches(label: str) -> bool:
+            return relationship is None or relationship.lower() in label.lower()
+
+        results = {}
+        for person, label in self.edges(i):
+            if not self.nodes[person].startswith('people/') or not matches(label):
+                continue
+            for other, other_label in self.edges(person):
+                if other == i or not self.nodes[other].startswith('places/') or not matches(other_label):
+                    continue
+                if math.isnan(self.lat[other]):
+                    continue
+                distance = self.distance_km(i, other)
+                if distance <= km:
+                    entry = results.setdefault(other, {
+                        'ref': self.nodes[other],
+                        'km': round(distance, 3),
+                        'via': [],
+                    })
+                    entry['via'].append(self.nodes[person])
+
+        return sorted(results.values(), key=lambda r: r['km'])
+
+    def people_of(self, ref: str) -> List[Dict[str, Any]]:
+        """
+        People connected to a record: directly, or through its places
+
+        For a map or plan ("people connected to this walk") this collects
+        the people of every place on it.
+        """
+        people: Dict[int, Dict[str, Any]] = {}
+        i = self.node(ref)
+        for j, label in self.edges(i):
+            if self.nodes[j].startswith('people/'):
+                people.setdefault(j, {'ref': self.nodes[j], 'via': []})['via'].append(ref)
+            elif self.nodes[j].startswith('places/'):
+                for k, _ in self.edges(j):
+                    if self.nodes[k].startswith('people/'):
+                        people.setdefault(k, {'ref': self.nodes[k], 'via': []})['via'].append(self.nodes[j])
+        return sorted(people.values(), key=lambda p: (-len(p['via']), p['ref']))
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+def collect(data_dir: Path = DATA_DIR) -> Tuple[List[str], Dict[str, Tuple[float, float]], List[Tuple[str, str, str]]]:
+    """Nodes, place coordinates and labelled edges from one pass over the corpus"""
+    nodes = []
+    coordinates = {}
+    edges = []
+
+    def add_plan_steps(ref: str, steps: List[Dict[str, Any]]):
+        for step in steps:
+            for place_id in step.get('placeIds', []):
+                edges.append((ref, place_ref(place_id), 'plan'))
+            for person in step.get('people', []):
+                if person.get('id'):
+                    edges.append((ref, person['id'], person.get('role') or 'plan'))
+            add_plan_steps(ref, step.get('subSteps', []))
+
+    for collection in COLLECTIONS:
+        for path in iter_paths(collection, data_dir):
+            doc = load_json(path)
+            spec = doc.get('spec', {})
+            ref = composite_id(collection, path, doc)
+            nodes.append(ref)
+
+            if collection == 'people':
+                if spec.get('birthPlace'):
+                    edges.append((ref, spec['birthPlace'], 'birthPlace'))
+
+            elif collection == 'places':
+                location = spec.get('location', {})
+                if location.get('latitude') is not None and location.get('longitude') is not None:
+                    coordinates[ref] = (location['latitude'], location['longitude'])
+                if location.get('province'):
+                    edges.append((ref, location['province'], 'province'))
+                for person in spec.get('people', []):
+                    if person.get('id'):
+                        label = ', '.join(person.get('relationship', [])) or 'related'
+                        edges.append((ref, person['id'], label))
+
+            elif collection == 'maps':
+                for place_id in spec.get('content', {}).get('ids', []):
+                    edges.append((ref, place_ref(place_id), 'map'))
+
+            elif collection == 'plans':
+                add_plan_steps(ref, spec.get('steps', []))
+
+    return nodes, coordinates, edges
+
+
+def load_graph(data_dir: Path = DATA_DIR, graph_file: Path = GRAPH_FILE,
+               force: bool = False) -> Graph:
+    """Load the cached graph, rebuilding it if any data file changed"""
+    signature = collection_signature(list(COLLECTIONS), data_dir)
+    graph = None if force else Graph.load(graph_file, signature)
+    if graph is None:
+        graph = Graph.from_edges(*collect(data_dir))
+        graph.save(graph_file, signature)
+    return graph
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Traverse relationships between Mrrakc places, people and provinces'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '-f', '--rebuild',
+        action='store_true',
+        help='Ignore the cached graph'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    neighbors_parser = subparsers.add_parser('neighbors', help='Direct relationships of a record')
+    neighbors_parser.add_argument('ref', help='Record reference (e.g. people/henri-prost)')
+
+    path_parser = subparsers.add_parser('path', help='Shortest path between two records')
+    path_parser.add_argument('source')
+    path_parser.add_argument('target')
+    path_parser.add_argument(
+        '--through-provinces',
+        action='store_true',
+        help='Allow paths through province nodes'
+    )
+
+    nearby_parser = subparsers.add_parser('nearby', help='Places sharing people with a place, within a radius')
+    nearby_parser.add_argument('ref', help='Place reference (e.g. places/casablanca/rialto-cinema)')
+    nearby_parser.add_argument('--km', type=float, default=2.0, help='Radius in km (default: 2)')
+    nearby_parser.add_argument('--relationship', help='Only follow this relationship (e.g. architect)')
+
+    people_parser = subparsers.add_parser('people', help='People connected to a record or its places')
+    people_parser.add_argument('ref', help='Record reference (e.g. maps/casablanca-mohammed-v-walk)')
+
+    args = parser.parse_args()
+
+    try:
+        graph = load_graph(args.data_dir, force=args.rebuild)
+
+        if args.command == 'neighbors':
+            for ref, label in graph.neighbors(args.ref):
+                print(f"{ref}  ({label})")
+
+        elif args.command == 'path':
+            path = graph.shortest_path(args.source, args.target, args.through_provinces)
+            print(' -> '.join(path) if path else 'No path found')
+
+        elif args.command == 'nearby':
+            for result in graph.nearby_by_same_people(args.ref, args.km, args.relationship):
+                print(f"{result['km']:6.3f} km  {result['ref']}  (via {', '.join(result['via'])})")
+
+        elif args.command == 'people':
+            for person in graph.people_of(args.ref):
+                print(f"{person['ref']}  ({len(person['via'])} places)")
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
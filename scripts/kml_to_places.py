@@ -2,15 +2,25 @@
 """
 KML to Mrrakc Places JSON Converter
 A modular pipeline script for converting KML files to Mrrakc Places schema
+
+GeoJSON, CSV and GPX exports are accepted as well; the parse stage is
+chosen from the input file extension.
 """
 
+from __future__ import annotations
+
 import json
-import argparse
+import re
 import sys
 from pathlib import Path
-from typing import Dict, Any, List
 from abc import ABC, abstractmethod
 
+# Annotations are not evaluated at runtime (see the __future__ import), so
+# typing is only imported for type checkers; argparse is imported in main()
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Any, List, Iterable, Iterator
+
 
 # ============================================================================
 # CONFIGURATION
@@ -58,10 +68,7 @@ class ParseKMLStage(Stage):
         if not input_file:
             raise ValueError("No input file specified")
         
-        try:
-            from xml.etree import ElementTree as ET
-        except ImportError:
-            raise ImportError("xml.etree.ElementTree is required")
+        from xml.etree import ElementTree as ET
         
         # Parse KML file
         tree = ET.parse(input_file)
@@ -155,6 +162,354 @@ class ParseKMLStage(Stage):
         }
 
 
+# ============================================================================
+# STAGE 1 (ALTERNATIVES): PARSE GEOJSON / CSV / GPX
+# ============================================================================
+#
+# These stages produce the same placemark dicts as ParseKMLStage (name,
+# description, longitude, latitude, altitude, extended_data) but yield them
+# one at a time instead of building a list, so large exports are processed
+# with constant memory by NormalizeStage and EnrichStage.
+
+class ParseGeoJSONStage(Stage):
+    """Parse GeoJSON FeatureCollection and extract point features"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    NAME_KEYS = ['name', 'title', 'Name']
+    DESCRIPTION_KEYS = ['description', 'desc', 'Description']
+
+    def __init__(self):
+        super().__init__("PARSE")
+
+    def iter_features(self, input_file: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream features out of a FeatureCollection
+
+        The top-level object is walked key by key with raw_decode; only the
+        members of the "features" array are decoded one at a time, so the
+        whole document is never held in memory.
+        """
+        decoder = json.JSONDecoder()
+
+        with open(input_file, 'r', encoding='utf-8') as f:
+            buffer = ''
+            pos = 0
+            eof = False
+
+            def fill():
+                nonlocal buffer, pos, eof
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    eof = True
+                buffer = buffer[pos:] + chunk
+                pos = 0
+
+            def skip_ws():
+                nonlocal pos
+                while True:
+                    while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                        pos += 1
+                    if pos < len(buffer) or eof:
+                        return
+                    fill()
+
+            def expect(chars: str) -> str:
+                skip_ws()
+                if pos >= len(buffer) or buffer[pos] not in chars:
+                    raise ValueError(f"Invalid GeoJSON: expected one of {chars!r}")
+                return buffer[pos]
+
+            def decode_value():
+                nonlocal pos
+                skip_ws()
+                while True:
+                    try:
+                        value, end = decoder.raw_decode(buffer, pos)
+                        # A number at the end of the buffer may be truncated
+                        if end < len(buffer) or eof:
+                            pos = end
+                            return value
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    fill()
+
+            fill()
+            expect('{')
+            pos += 1
+
+            while True:
+                if expect('}"') == '}':
+                    return
+                key = decode_value()
+                expect(':')
+                pos += 1
+
+                if key != 'features':
+                    decode_value()
+                else:
+                    expect('[')
+                    pos += 1
+                    if expect(']{') == ']':
+                        pos += 1
+                    else:
+                        while True:
+                            feature = decode_value()
+                            yield feature
+                            if expect(',]') == ']':
+                                pos += 1
+                                break
+                            pos += 1
+
+                if expect(',}') == '}':
+                    return
+                pos += 1
+
+    def feature_to_placemark(self, feature: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a GeoJSON feature to a placemark dict"""
+        place_data = {}
+        properties = dict(feature.get('properties') or {})
+
+        for key in self.NAME_KEYS:
+            if properties.get(key):
+                place_data['name'] = str(properties.pop(key)).strip()
+                break
+
+        for key in self.DESCRIPTION_KEYS:
+            if properties.get(key):
+                place_data['description'] = str(properties.pop(key)).strip()
+                break
+
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'Point':
+            coords = geometry.get('coordinates') or []
+            if len(coords) >= 2:
+                place_data['longitude'] = float(coords[0])
+                place_data['latitude'] = float(coords[1])
+                if len(coords) >= 3 and coords[2] is not None:
+                    place_data['altitude'] = float(coords[2])
+
+        extended_data = {
+            key: str(value).strip()
+            for key, value in properties.items()
+            if value is not None and str(value).strip()
+        }
+        if extended_data:
+            place_data['extended_data'] = extended_data
+
+        return place_data
+
+    def iter_placemarks(self, input_file: str) -> Iterator[Dict[str, Any]]:
+        count = 0
+        for feature in self.iter_features(input_file):
+            geom_type = (feature.get('geometry') or {}).get('type')
+            if geom_type != 'Point':
+                self.log(f"Skipping {geom_type} feature (only Point is supported)")
+                continue
+
+            place_data = self.feature_to_placemark(feature)
+            self.log(f"Parsed feature: {place_data.get('name', 'unnamed')}")
+
+            if 'name' in place_data or ('longitude' in place_data and 'latitude' in place_data):
+                count += 1
+                yield place_data
+
+        self.log(f"Found {count} placemarks")
+
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Parsing GeoJSON file...")
+
+        input_file = data.get('input_file')
+        if not input_file:
+            raise ValueError("No input file specified")
+
+        return {
+            'placemarks': self.iter_placemarks(input_file),
+            'source_file': data.get('input_file')
+        }
+
+
+class ParseCSVStage(Stage):
+    """Parse CSV file with latitude/longitude columns"""
+
+    # Accepted header names (compared lowercased)
+    COLUMNS = {
+        'name': ['name', 'title', 'place', 'label'],
+        'description': ['description', 'desc', 'notes', 'comment'],
+        'latitude': ['latitude', 'lat', 'y'],
+        'longitude': ['longitude', 'lon', 'lng', 'long', 'x'],
+        'altitude': ['altitude', 'alt', 'elevation', 'ele', 'z'],
+    }
+
+    def __init__(self):
+        super().__init__("PARSE")
+
+    def resolve_columns(self, fieldnames: List[str]) -> Dict[str, str]:
+        """Map placemark fields to the CSV header names that hold them"""
+        lowered = {name.strip().lower(): name for name in fieldnames if name}
+        columns = {}
+        for field, candidates in self.COLUMNS.items():
+            for candidate in candidates:
+                if candidate in lowered:
+                    columns[field] = lowered[candidate]
+                    break
+        return columns
+
+    def iter_placemarks(self, input_file: str) -> Iterator[Dict[str, Any]]:
+        import csv
+
+        # newline='' lets the csv module handle quoted multi-line fields
+        with open(input_file, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+            except csv.Error:
+                dialect = csv.excel
+
+            reader = csv.DictReader(f, dialect=dialect)
+            columns = self.resolve_columns(reader.fieldnames or [])
+
+            if 'latitude' not in columns or 'longitude' not in columns:
+                raise ValueError(
+                    f"CSV must have latitude and longitude columns, got: {reader.fieldnames}"
+                )
+
+            used = set(columns.values())
+            count = 0
+
+            for line_number, row in enumerate(reader, start=2):
+                place_data = {}
+
+                name = (row.get(columns.get('name')) or '').strip() if 'name' in columns else ''
+                if name:
+                    place_data['name'] = name
+
+                if 'description' in columns:
+                    description = (row.get(columns['description']) or '').strip()
+                    if description:
+                        place_data['description'] = description
+
+                try:
+                    for field in ['longitude', 'latitude', 'altitude']:
+                        value = (row.get(columns.get(field)) or '').strip() if field in columns else ''
+                        if value:
+                            place_data[field] = float(value.replace(',', '.'))
+                except ValueError:
+                    self.log(f"Skipping line {line_number}: invalid coordinates")
+                    continue
+
+                extended_data = {
+                    key: value.strip()
+                    for key, value in row.items()
+                    if key and key not in used and isinstance(value, str) and value.strip()
+                }
+                if extended_data:
+                    place_data['extended_data'] = extended_data
+
+                self.log(f"Parsed row: {place_data.get('name', 'unnamed')}")
+
+                if 'name' in place_data or ('longitude' in place_data and 'latitude' in place_data):
+                    count += 1
+                    yield place_data
+
+        self.log(f"Found {count} placemarks")
+
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Parsing CSV file...")
+
+        input_file = data.get('input_file')
+        if not input_file:
+            raise ValueError("No input file specified")
+
+        return {
+            'placemarks': self.iter_placemarks(input_file),
+            'source_file': data.get('input_file')
+        }
+
+
+class ParseGPXStage(Stage):
+    """Parse GPX file and extract waypoints"""
+
+    def __init__(self):
+        super().__init__("PARSE")
+
+    def iter_placemarks(self, input_file: str) -> Iterator[Dict[str, Any]]:
+        from xml.etree import ElementTree as ET
+
+        count = 0
+        position = 0
+        # iterparse + clear() keeps only the current waypoint in memory
+        for event, elem in ET.iterparse(input_file, events=('end',)):
+            tag = elem.tag.split('}')[-1]
+            if tag != 'wpt':
+                continue
+
+            place_data = {}
+            description_lines = []
+            position += 1
+
+            try:
+                for child in elem:
+                    child_tag = child.tag.split('}')[-1]
+                    text = (child.text or '').strip()
+
+                    if child_tag == 'name' and text:
+                        place_data['name'] = text
+                    elif child_tag in ('desc', 'cmt') and text:
+                        description_lines.append(text)
+                    elif child_tag == 'ele' and text:
+                        place_data['altitude'] = float(text)
+                    elif child_tag == 'link' and child.get('href'):
+                        # URLs in the description are turned into links by NormalizeStage
+                        description_lines.append(child.get('href'))
+
+                if elem.get('lat') and elem.get('lon'):
+                    place_data['latitude'] = float(elem.get('lat'))
+                    place_data['longitude'] = float(elem.get('lon'))
+            except (TypeError, ValueError):
+                self.log(f"Skipping waypoint {position} ({place_data.get('name', 'unnamed')}): "
+                         f"invalid coordinates or elevation")
+                elem.clear()
+                continue
+
+            if description_lines:
+                place_data['description'] = '\n'.join(description_lines)
+
+            elem.clear()
+
+            self.log(f"Parsed waypoint: {place_data.get('name', 'unnamed')}")
+
+            if 'name' in place_data or ('longitude' in place_data and 'latitude' in place_data):
+                count += 1
+                yield place_data
+
+        self.log(f"Found {count} placemarks")
+
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Parsing GPX file...")
+
+        input_file = data.get('input_file')
+        if not input_file:
+            raise ValueError("No input file specified")
+
+        return {
+            'placemarks': self.iter_placemarks(input_file),
+            'source_file': data.get('input_file')
+        }
+
+
+# Parse stage to use for each supported input extension
+PARSE_STAGES = {
+    '.kml': ParseKMLStage,
+    '.geojson': ParseGeoJSONStage,
+    '.json': ParseGeoJSONStage,
+    '.csv': ParseCSVStage,
+    '.gpx': ParseGPXStage,
+}
+
+
 # ============================================================================
 # STAGE 2: NORMALIZE
 # ============================================================================
@@ -162,9 +517,17 @@ class ParseKMLStage(Stage):
 class NormalizeStage(Stage):
     """Normalize and clean data"""
     
+    BR_PATTERN = re.compile(r'<br\s*/?>', re.IGNORECASE)
+    URL_PATTERN = re.compile(r'https?://[^\s]+')
+    TAG_PATTERN = re.compile(r'<[^>]+>')
+    
     def __init__(self):
         super().__init__("NORMALIZE")
         
+        # Only needed once text is actually cleaned
+        import html
+        self.unescape = html.unescape
+        
         # URL patterns for link type detection
         self.url_patterns = {
             'video': [
@@ -223,8 +586,6 @@ class NormalizeStage(Stage):
         - Links: Any URL (http:// or https://)
         - Remaining text becomes the description
         """
-        import re
-        
         result = {
             'description': '',
             'links': [],
@@ -236,13 +597,12 @@ class NormalizeStage(Stage):
             return result
         
         # Replace <br> tags with newlines
-        description = re.sub(r'<br\s*/?>', '\n', description, flags=re.IGNORECASE)
+        description = self.BR_PATTERN.sub('\n', description)
         
         lines = description.split('\n')
         description_parts = []
         
-        # URL regex pattern
-        url_pattern = re.compile(r'https?://[^\s]+')
+        url_pattern = self.URL_PATTERN
         
         for line in lines:
             line = line.strip()
@@ -325,64 +685,69 @@ class NormalizeStage(Stage):
         if not text:
             return ''
         
-        import html
-        
         # Decode HTML entities
-        text = html.unescape(text)
+        text = self.unescape(text)
         
         # Remove HTML tags (basic cleanup)
-        import re
-        text = re.sub(r'<[^>]+>', '', text)
+        text = self.TAG_PATTERN.sub('', text)
         
         # Normalize whitespace
         text = ' '.join(text.split())
         
         return text.strip()
     
-    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        self.log("Normalizing data...")
+    def normalize_place(self, place: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a single placemark"""
+        normalized = {}
         
-        placemarks = data.get('placemarks', [])
-        normalized_places = []
+        # Clean and normalize name
+        if 'name' in place:
+            normalized['name'] = self.clean_text(place['name'])
+        
+        # Parse and extract from description
+        raw_description = place.get('description', '')
+        parsed = self.parse_description(raw_description)
+        
+        normalized['description'] = parsed['description']
+        
+        if parsed['links']:
+            normalized['links'] = parsed['links']
+        
+        if parsed['extracted_fields']:
+            normalized['extracted_fields'] = parsed['extracted_fields']
+        
+        # Normalize coordinates
+        coords = self.normalize_coordinates(place)
+        if coords:
+            normalized['coordinates'] = coords
         
+        # Preserve extended data
+        if 'extended_data' in place:
+            normalized['extended_data'] = place['extended_data']
+        
+        self.log(f"Normalized: {normalized.get('name', 'unnamed')} "
+                f"({len(parsed['links'])} links, "
+                f"{len(parsed['extracted_fields'])} fields)")
+        
+        return normalized
+    
+    def iter_normalized(self, placemarks: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        count = 0
         for place in placemarks:
-            normalized = {}
-            
-            # Clean and normalize name
-            if 'name' in place:
-                normalized['name'] = self.clean_text(place['name'])
-            
-            # Parse and extract from description
-            raw_description = place.get('description', '')
-            parsed = self.parse_description(raw_description)
-            
-            normalized['description'] = parsed['description']
-            
-            if parsed['links']:
-                normalized['links'] = parsed['links']
-            
-            if parsed['extracted_fields']:
-                normalized['extracted_fields'] = parsed['extracted_fields']
-            
-            # Normalize coordinates
-            coords = self.normalize_coordinates(place)
-            if coords:
-                normalized['coordinates'] = coords
-            
-            # Preserve extended data
-            if 'extended_data' in place:
-                normalized['extended_data'] = place['extended_data']
-            
-            normalized_places.append(normalized)
-            
-            self.log(f"Normalized: {normalized.get('name', 'unnamed')} "
-                    f"({len(parsed['links'])} links, "
-                    f"{len(parsed['extracted_fields'])} fields)")
+            count += 1
+            yield self.normalize_place(place)
         
-        self.log(f"Normalized {len(normalized_places)} places")
+        self.log(f"Normalized {count} places")
+    
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Normalizing data...")
+        
+        # Placemarks may be a generator from a streaming parse stage, so
+        # normalize lazily instead of materializing a list
+        placemarks = data.get('placemarks', [])
         
         return {
-            'normalized_places': normalized_places,
+            'normalized_places': self.iter_normalized(placemarks),
             'source_file': data.get('source_file')
         }
 
@@ -394,30 +759,49 @@ class NormalizeStage(Stage):
 class EnrichStage(Stage):
     """Enrich data with classifications and metadata"""
     
+    ID_INVALID_CHARS = re.compile(r'[^a-z0-9\s-]')
+    ID_WHITESPACE = re.compile(r'\s+')
+    ID_HYPHENS = re.compile(r'-+')
+    
     def __init__(self, kind_mappings_file=None, province_geojson_file=None, default_province=None):
         super().__init__("ENRICH")
         
         self.default_province = default_province or 'province/marrakech'
         
-        # Load kind mappings from file if provided
-        self.kind_mappings = {}
-        if kind_mappings_file and Path(kind_mappings_file).exists():
-            self.log(f"Loading kind mappings from {kind_mappings_file}")
-            with open(kind_mappings_file, 'r', encoding='utf-8') as f:
-                self.kind_mappings = json.load(f)
-            self.log(f"Loaded {len(self.kind_mappings)} kind mappings")
-        else:
-            self.log("No kind mappings file provided, using default kind")
-        
-        # Load province boundaries from GeoJSON if provided
-        self.province_boundaries = None
-        if province_geojson_file and Path(province_geojson_file).exists():
-            self.log(f"Loading province boundaries from {province_geojson_file}")
-            with open(province_geojson_file, 'r', encoding='utf-8') as f:
-                self.province_boundaries = json.load(f)
-            self.log(f"Loaded province boundaries")
-        else:
-            self.log("No province GeoJSON file provided, using default province")
+        # Mappings and boundaries are loaded on first use, so building the
+        # stage (or running it on places without coordinates) stays cheap
+        self.kind_mappings_file = kind_mappings_file
+        self.province_geojson_file = province_geojson_file
+        self._kind_mappings = None
+        self._province_locator = None
+        self._province_locator_loaded = False
+    
+    @property
+    def kind_mappings(self) -> Dict[str, str]:
+        if self._kind_mappings is None:
+            self._kind_mappings = {}
+            if self.kind_mappings_file and Path(self.kind_mappings_file).exists():
+                self.log(f"Loading kind mappings from {self.kind_mappings_file}")
+                with open(self.kind_mappings_file, 'r', encoding='utf-8') as f:
+                    self._kind_mappings = json.load(f)
+                self.log(f"Loaded {len(self._kind_mappings)} kind mappings")
+            else:
+                self.log("No kind mappings file provided, using default kind")
+        return self._kind_mappings
+    
+    @property
+    def province_locator(self):
+        if not self._province_locator_loaded:
+            self._province_locator_loaded = True
+            if self.province_geojson_file and Path(self.province_geojson_file).exists():
+                from boundaries import load_locator
+                
+                self.log(f"Loading province boundaries from {self.province_geojson_file}")
+                self._province_locator = load_locator(self.province_geojson_file)
+                self.log(f"Loaded {len(self._province_locator.provinces)} province boundaries")
+            else:
+                self.log("No province GeoJSON file provided, using default province")
+        return self._province_locator
     
     def classify_kind(self, place: Dict[str, Any]) -> str:
         """Get place kind from mappings file or use default"""
@@ -440,126 +824,104 @@ class EnrichStage(Stage):
         # You can add logic here if needed, or leave empty
         return []
     
-    def point_in_polygon(self, point: tuple, polygon: list) -> bool:
-        """Check if point is inside polygon using ray casting algorithm"""
-        x, y = point
-        n = len(polygon)
-        inside = False
-        
-        p1x, p1y = polygon[0]
-        for i in range(n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-        
-        return inside
-    
-    def determine_province(self, coords: Dict[str, float]) -> str:
-        """Determine province from coordinates using GeoJSON boundaries"""
+    def locate_province(self, coords: Dict[str, float]):
+        """
+        Determine province from coordinates, and how it was found
+        
+        Returns (province, nearest). Points outside every province boundary
+        (offshore, or in a sliver between polygons) get the province with
+        the nearest boundary, and `nearest` (a boundaries.NearestProvince)
+        tells how far it is and whether another province is almost as close.
+        """
         lat = coords.get('latitude')
         lon = coords.get('longitude')
         
         if not lat or not lon:
-            return self.default_province
+            return self.default_province, None
         
         # If no GeoJSON provided, use default
-        if not self.province_boundaries:
-            return self.default_province
+        if not self.province_locator:
+            return self.default_province, None
         
-        # Check each province in GeoJSON
-        point = (lon, lat)  # GeoJSON uses [lon, lat] order
+        # Precomputed lookup (see boundaries.py); honours polygon holes
+        province_id = self.province_locator.locate(lon, lat)
+        if province_id:
+            return province_id, None
         
-        for feature in self.province_boundaries.get('features', []):
-            properties = feature.get('properties', {})
-            geometry = feature.get('geometry', {})
-            
-            # Get province ID from properties
-            province_id = properties.get('id') or properties.get('province_id')
-            
-            if not province_id:
-                continue
-            
-            # Handle different geometry types
-            geom_type = geometry.get('type')
-            coordinates = geometry.get('coordinates', [])
-            
-            if geom_type == 'Polygon':
-                # Polygon coordinates are [exterior_ring, hole1, hole2, ...]
-                exterior_ring = coordinates[0] if coordinates else []
-                if self.point_in_polygon(point, exterior_ring):
-                    return province_id
-            
-            elif geom_type == 'MultiPolygon':
-                # MultiPolygon coordinates are [[polygon1], [polygon2], ...]
-                for polygon in coordinates:
-                    exterior_ring = polygon[0] if polygon else []
-                    if self.point_in_polygon(point, exterior_ring):
-                        return province_id
+        nearest = self.province_locator.nearest(lon, lat)
         
         # If no province found, use default
-        return self.default_province
+        if nearest is None:
+            return self.default_province, None
+        
+        return nearest.province, nearest
+    
+    def determine_province(self, coords: Dict[str, float]) -> str:
+        """Determine province from coordinates using GeoJSON boundaries"""
+        province_id, nearest = self.locate_province(coords)
+        if nearest is not None:
+            self.log(f"{coords.get('latitude')}, {coords.get('longitude')}: {nearest.describe()}")
+        return province_id
     
     def generate_id(self, name: str) -> str:
         """Generate kebab-case ID from name"""
-        import re
-        
         # Convert to lowercase
         id_str = name.lower()
         
         # Remove special characters except spaces and hyphens
-        id_str = re.sub(r'[^a-z0-9\s-]', '', id_str)
+        id_str = self.ID_INVALID_CHARS.sub('', id_str)
         
         # Replace spaces with hyphens
-        id_str = re.sub(r'\s+', '-', id_str)
+        id_str = self.ID_WHITESPACE.sub('-', id_str)
         
         # Remove multiple consecutive hyphens
-        id_str = re.sub(r'-+', '-', id_str)
+        id_str = self.ID_HYPHENS.sub('-', id_str)
         
         # Remove leading/trailing hyphens
         id_str = id_str.strip('-')
         
         return id_str
     
-    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        self.log("Enriching data...")
+    def enrich_place(self, place: Dict[str, Any]) -> Dict[str, Any]:
+        """Enrich a single normalized place"""
+        enriched = place.copy()
         
-        normalized_places = data.get('normalized_places', [])
-        enriched_places = []
+        # Generate ID from name
+        if 'name' in place:
+            enriched['id'] = self.generate_id(place['name'])
+        
+        # Classify kind from mappings file
+        enriched['kind'] = self.classify_kind(enriched)
+        
+        # Infer time periods (empty by default)
+        enriched['timePeriods'] = self.infer_time_periods(place)
+        
+        # Determine province from GeoJSON or use default
+        if 'coordinates' in place:
+            enriched['province'] = self.determine_province(place['coordinates'])
+        else:
+            enriched['province'] = self.default_province
+        
+        self.log(f"Enriched: {enriched.get('name', 'unnamed')} -> "
+                f"{enriched['kind']} in {enriched['province']}")
         
+        return enriched
+    
+    def iter_enriched(self, normalized_places: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        count = 0
         for place in normalized_places:
-            enriched = place.copy()
-            
-            # Generate ID from name
-            if 'name' in place:
-                enriched['id'] = self.generate_id(place['name'])
-            
-            # Classify kind from mappings file
-            enriched['kind'] = self.classify_kind(enriched)
-            
-            # Infer time periods (empty by default)
-            enriched['timePeriods'] = self.infer_time_periods(place)
-            
-            # Determine province from GeoJSON or use default
-            if 'coordinates' in place:
-                enriched['province'] = self.determine_province(place['coordinates'])
-            else:
-                enriched['province'] = self.default_province
-            
-            enriched_places.append(enriched)
-            
-            self.log(f"Enriched: {enriched.get('name', 'unnamed')} -> "
-                    f"{enriched['kind']} in {enriched['province']}")
+            count += 1
+            yield self.enrich_place(place)
         
-        self.log(f"Enriched {len(enriched_places)} places")
+        self.log(f"Enriched {count} places")
+    
+    def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.log("Enriching data...")
+        
+        normalized_places = data.get('normalized_places', [])
         
         return {
-            'enriched_places': enriched_places,
+            'enriched_places': self.iter_enriched(normalized_places),
             'source_file': data.get('source_file')
         }
 
@@ -760,6 +1122,10 @@ class SavePlacesStage(Stage):
     
     def __init__(self):
         super().__init__("SAVE")
+        
+        # Same byte-for-byte layout as `canonical.py reformat`
+        from canonical import CanonicalWriter
+        self.writer = CanonicalWriter()
     
     def run(self, data: Dict[str, Any]) -> Dict[str, Any]:
         self.log("Saving places to individual files...")
@@ -840,8 +1206,7 @@ class SavePlacesStage(Stage):
                 if response in ['n', 'no']:
                    continue
 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(place, f, indent=2, ensure_ascii=False)
+            self.writer.write(file_path, place, 'places')
             
             saved_count += 1
         
@@ -860,14 +1225,36 @@ class Pipeline:
     """Main pipeline orchestrator"""
     
     def __init__(self, kind_mappings=None, province_geojson=None, default_province=None):
-        self.stages = {
-            'parse': ParseKMLStage(),
-            'normalize': NormalizeStage(),
-            'enrich': EnrichStage(kind_mappings, province_geojson, default_province),
-            'validate': ValidateStage(),
-            'transform': TransformStage(),
-            'save': SavePlacesStage()
+        # Stages are only built when they are about to run, so a partial run
+        # (e.g. --stages parse) never pays for the others' setup
+        self.stage_factories = {
+            'parse': None,  # Chosen from the input file extension in run()
+            'normalize': NormalizeStage,
+            'enrich': lambda: EnrichStage(kind_mappings, province_geojson, default_province),
+            'validate': ValidateStage,
+            'transform': TransformStage,
+            'save': SavePlacesStage
         }
+        self.stages: Dict[str, Stage] = {}
+    
+    def get_parse_stage(self, input_file: Path) -> Stage:
+        """Pick the parse stage matching the input file extension"""
+        suffix = Path(input_file).suffix.lower()
+        if suffix not in PARSE_STAGES:
+            raise ValueError(
+                f"Unsupported input format: {suffix or input_file} "
+                f"(expected one of {', '.join(sorted(PARSE_STAGES))})"
+            )
+        return PARSE_STAGES[suffix]()
+    
+    def get_stage(self, stage_name: str, input_file: Path) -> Stage:
+        """Build a stage on first use"""
+        if stage_name not in self.stages:
+            if stage_name == 'parse':
+                self.stages[stage_name] = self.get_parse_stage(input_file)
+            else:
+                self.stages[stage_name] = self.stage_factories[stage_name]()
+        return self.stages[stage_name]
     
     def run(self, input_file: Path, stages_to_run: List[str]) -> Dict[str, Any]:
         """Run specified stages in sequence"""
@@ -881,12 +1268,13 @@ class Pipeline:
         # Initialize with input file
         data = {'input_file': str(input_file)}
         
-        # Run each stage
         for stage_name in stages_to_run:
-            if stage_name not in self.stages:
+            if stage_name not in self.stage_factories:
                 raise ValueError(f"Unknown stage: {stage_name}")
-            
-            stage = self.stages[stage_name]
+        
+        # Run each stage
+        for stage_name in stages_to_run:
+            stage = self.get_stage(stage_name, input_file)
             data = stage.run(data)
         
         return data
@@ -897,14 +1285,16 @@ class Pipeline:
 # ============================================================================
 
 def main():
+    import argparse
+    
     parser = argparse.ArgumentParser(
-        description='Convert KML files to Mrrakc Places JSON format'
+        description='Convert KML, GeoJSON, CSV or GPX files to Mrrakc Places JSON format'
     )
     
     parser.add_argument(
         'input',
         type=Path,
-        help='Input KML file'
+        help='Input file (.kml, .geojson/.json, .csv or .gpx)'
     )
     
     parser.add_argument(
@@ -956,8 +1346,10 @@ def main():
     if args.province_geojson and not args.province_geojson.exists():
         print(f"Warning: Province GeoJSON file not found: {args.province_geojson}")
     
-    # Set output file
+    # Set output file (never overwrite a .json input)
     output = args.output or args.input.with_suffix('.json')
+    if output.resolve() == args.input.resolve():
+        output = args.input.with_suffix('.places.json')
     
     # Parse stages
     stages = [s.strip() for s in args.stages.split(',')]
@@ -986,6 +1378,10 @@ def main():
             # Raw parsed output
             output_data = result['placemarks']
         
+        # Streaming stages hand back generators
+        if not isinstance(output_data, (list, dict)):
+            output_data = list(output_data)
+        
         with open(output, 'w', encoding='utf-8') as f:
             json.dump(output_data, f, indent=2, ensure_ascii=False)
         
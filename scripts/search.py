@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Full-Text Search
+Inverted index over place and people prose (names, spec.description, bio
+and timeline entries) with BM25 ranking.
+
+    python3 scripts/search.py build
+    python3 scripts/search.py query "art deco cinema"
+
+Tokenization folds accents (é -> e), drops French elisions (l', d', qu'),
+normalizes Arabic letter variants and the "al-" article, and removes common
+English/French/Arabic stop words.
+
+The index is a single binary file that queries memory-map: a sorted,
+fixed-width term dictionary is binary-searched, so only the postings of
+the query terms are touched. Token counts are cached per data file, so a
+rebuild only re-tokenizes the files that changed.
+"""
+
+import argparse
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, List, Iterator, Tuple
+
+from corpus import (
+    BUILD_DIR, DATA_DIR, FileCache, composite_id, file_signature,
+    iter_paths, load_json, relative_key,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+INDEX_FILE = BUILD_DIR / 'search.idx'
+
+# Bump when tokenization or the file layout changes
+INDEX_VERSION = 2
+
+# Term frequency multiplier per field
+FIELD_WEIGHTS = {
+    'name': 3,
+    'description': 1,
+    'timeline': 1,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOP_WORDS = {
+    # English
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to',
+    'was', 'were', 'with',
+    # French
+    'au', 'aux', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'en', 'est', 'et',
+    'la', 'le', 'les', 'un', 'une', 'par', 'pour', 'sur', 'qui', 'que',
+    # Arabic
+    'في', 'من', 'على', 'الى', 'عن', 'مع', 'هذا', 'هذه', 'التي', 'الذي', 'و',
+}
+
+# French elided articles/pronouns: l'eglise -> eglise
+ELISION = re.compile(r"\b(?:l|d|j|m|n|s|t|c|qu|jusqu|lorsqu|puisqu)['’]", re.IGNORECASE)
+
+TOKEN = re.compile(r"\w+")
+
+ARABIC_VARIANTS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ـ': None,  # tatweel
+})
+
+
+# ============================================================================
+# TOKENIZER
+# ============================================================================
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and Arabic diacritics, unify Arabic letter variants"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return text.translate(ARABIC_VARIANTS)
+
+
+# Stored folded, as tokens are compared after fold() (على -> علي)
+STOP_WORDS = {fold(word) for word in STOP_WORDS}
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Yield normalized search terms from free text"""
+    if not text:
+        return
+    text = ELISION.sub('', fold(text))
+    for token in TOKEN.findall(text):
+        # Before stripping the article, which would turn التي into تي
+        if token in STOP_WORDS:
+            continue
+        # Arabic definite article
+        if token.startswith('ال') and len(token) > 3:
+            token = token[2:]
+        if token in STOP_WORDS or (len(token) == 1 and not token.isdigit()):
+            continue
+        yield token
+
+
+def document_terms(spec: Dict[str, Any], description_field: str) -> Dict[str, int]:
+    """Weighted term frequencies for a place or person spec"""
+    fields = {
+        'name': spec.get('name', ''),
+        'description': spec.get(description_field, ''),
+        'timeline': ' '.join(
+            f"{event.get('title', '')} {event.get('description', '')}"
+            for event in spec.get('timeline', [])
+        ),
+    }
+
+    terms: Dict[str, int] = {}
+    for field, text in fields.items():
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + weight
+    return terms
+
+
+# ============================================================================
+# FILE LAYOUT
+# ============================================================================
+#
+# header    magic, version, doc count, term count, average doc length,
+#           offsets of the four sections below
+# docs      fixed-width rows: length, ref offset/len, title offset/len
+# terms     fixed-width rows sorted by UTF-8 bytes: term offset/len,
+#           first posting, document frequency
+# postings  (doc id, tf) pairs grouped by term
+# strings   UTF-8 blob referenced by the tables above
+
+MAGIC = b'MRSI'
+HEADER = struct.Struct('<4sIIIdQQQQ')
+DOC = struct.Struct('<IIHIH')
+TERM = struct.Struct('<IHII')
+POSTING = struct.Struct('<IH')
+
+
+class IndexBuilder:
+    """Build the on-disk index from the data tree"""
+
+    DESCRIPTION_FIELDS = {
+        'places': 'description',
+        'people': 'bio',
+    }
+
+    def __init__(self, index_file: Path = INDEX_FILE, data_dir: Path = DATA_DIR):
+        self.index_file = Path(index_file)
+        self.data_dir = Path(data_dir)
+        self.cache = None
+
+    def log(self, message: str):
+        print(f"[SEARCH] {message}")
+
+    def collect(self, force: bool = False) -> Tuple[List[Dict[str, Any]], FileCache]:
+        """Term counts for every document, re-tokenizing only changed files"""
+        if self.cache is None:
+            self.cache = FileCache('search', tag=str(INDEX_VERSION))
+        cache = self.cache
+        cache.hits = cache.misses = 0
+        documents = []
+        keys = set()
+
+        for collection, description_field in self.DESCRIPTION_FIELDS.items():
+            for path in iter_paths(collection, self.data_dir):
+                key = relative_key(path, self.data_dir)
+                signature = file_signature(path)
+                keys.add(key)
+
+                document = None if force else cache.get(key, signature)
+                if document is None:
+                    doc = load_json(path)
+                    spec = doc.get('spec', {})
+                    document = {
+                        'ref': composite_id(collection, path, doc),
+                        'title': spec.get('name', ''),
+                        'terms': document_terms(spec, description_field),
+                    }
+                    cache.put(key, signature, document)
+
+                documents.append(document)
+
+        cache.prune(keys)
+        return documents, cache
+
+    def run(self, force: bool = False) -> bool:
+        """Rebuild the index if any source file changed; return True if written"""
+        documents, cache = self.collect(force)
+
+        if not cache.dirty and self.index_file.exists() and not force:
+            self.log(f"Up to date ({len(documents)} documents)")
+            return False
+
+        self.log(f"Indexing {len(documents)} documents "
+                 f"({cache.misses} re-tokenized, {cache.hits} cached)")
+        self.write(documents)
+        cache.save()
+        return True
+
+    def write(self, documents: List[Dict[str, Any]]):
+        strings = bytearray()
+
+        def add_string(value: str) -> Tuple[int, int]:
+            data = value.encode('utf-8')[:0xFFFF]
+            offset = len(strings)
+            strings.extend(data)
+            return offset, len(data)
+
+        postings: Dict[bytes, List[Tuple[int, int]]] = {}
+        doc_rows = bytearray()
+        total_length = 0
+
+        for doc_id, document in enumerate(documents):
+            length = sum(document['terms'].values())
+            total_length += length
+            ref_off, ref_len = add_string(document['ref'])
+            title_off, title_len = add_string(document['title'])
+            doc_rows.extend(DOC.pack(length, ref_off, ref_len, title_off, title_len))
+
+            for term, tf in document['terms'].items():
+                postings.setdefault(term.encode('utf-8'), []).append((doc_id, min(tf, 0xFFFF)))
+
+        term_rows = bytearray()
+        posting_rows = bytearray()
+        position = 0
+        for term in sorted(postings):
+            entries = postings[term]
+            term_off = len(strings)
+            strings.extend(term)
+            term_rows.extend(TERM.pack(term_off, len(term), position, len(entries)))
+            for doc_id, tf in entries:
+                posting_rows.extend(POSTING.pack(doc_id, tf))
+            position += len(entries)
+
+        avgdl = total_length / len(documents) if documents else 0.0
+        docs_offset = HEADER.size
+        terms_offset = docs_offset + len(doc_rows)
+        postings_offset = terms_offset + len(term_rows)
+        strings_offset = postings_offset + len(posting_rows)
+
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, INDEX_VERSION, len(documents), len(postings), avgdl,
+                                docs_offset, terms_offset, postings_offset, strings_offset))
+            f.write(doc_rows)
+            f.write(term_rows)
+            f.write(posting_rows)
+            f.write(strings)
+        os.replace(tmp, self.index_file)
+
+        self.log(f"Wrote {self.index_file} ({len(postings)} terms, "
+                 f"{strings_offset + len(strings)} bytes)")
+
+
+# ============================================================================
+# READER
+# ============================================================================
+
+class SearchIndex:
+    """Memory-mapped reader for the on-disk index"""
+
+    def __init__(self, index_file: Path = INDEX_FILE):
+        self.index_file = Path(index_file)
+        with open(self.index_file, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.n_docs, self.n_terms, self.avgdl, self.docs_offset,
+         self.terms_offset, self.postings_offset, self.strings_offset) = HEADER.unpack_from(self.buffer, 0)
+
+        if magic != MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"Incompatible search index: {self.index_file} (rebuild it)")
+
+    def close(self):
+        self.buffer.close()
+
+    def string(self, offset: int, length: int) -> bytes:
+        start = self.strings_offset + offset
+        return self.buffer[start:start + length]
+
+    def term_at(self, i: int) -> Tuple[bytes, int, int]:
+        term_off, term_len, first, df = TERM.unpack_from(self.buffer, self.terms_offset + i * TERM.size)
+        return self.string(term_off, term_len), first, df
+
+    def lower_bound(self, term: bytes) -> int:
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term_at(mid)[0] < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, term: str, prefix: bool = False) -> List[Tuple[int, int]]:
+        """Return (first posting, df) ranges for a term, or every term it prefixes"""
+        key = term.encode('utf-8')
+        ranges = []
+        i = self.lower_bound(key)
+        while i < self.n_terms:
+            found, first, df = self.term_at(i)
+            if found == key or (prefix and found.startswith(key)):
+                ranges.append((first, df))
+                if not prefix:
+                    break
+                i += 1
+            else:
+                break
+        return ranges
+
+    def document(self, doc_id: int) -> Dict[str, Any]:
+        length, ref_off, ref_len, title_off, title_len = DOC.unpack_from(
+            self.buffer, self.docs_offset + doc_id * DOC.size)
+        return {
+            'ref': self.string(ref_off, ref_len).decode('utf-8'),
+            'title': self.string(title_off, title_len).decode('utf-8'),
+            'length': length,
+        }
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank documents for a query with BM25
+
+        A trailing '*' on a query word matches every term with that prefix.
+        """
+        scores: Dict[int, float] = {}
+
+        for word in query.split():
+            prefix = word.endswith('*')
+            for term in tokenize(word.rstrip('*')):
+                for first, df in self.lookup(term, prefix=prefix):
+                    idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+                    offset = self.postings_offset + first * POSTING.size
+                    for doc_id, tf in POSTING.iter_unpack(self.buffer[offset:offset + df * POSTING.size]):
+                        length = DOC.unpack_from(self.buffer, self.docs_offset + doc_id * DOC.size)[0]
+                        norm = K1 * (1 - B + B * length / self.avgdl) if self.avgdl else K1
+                        scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        results = []
+        for doc_id, score in best:
+            document = self.document(doc_id)
+            document['score'] = round(score, 4)
+            results.append(document)
+        return results
+
+
+def open_index(index_file: Path = INDEX_FILE, data_dir: Path = DATA_DIR,
+               update: bool = True) -> SearchIndex:
+    """Open the index, building or refreshing it first when asked"""
+    if update or not Path(index_file).exists():
+        IndexBuilder(index_file, data_dir).run()
+    return SearchIndex(index_file)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Full-text search over Mrrakc places and people'
+    )
+
+    parser.add_argument(
+        '-i', '--index',
+        type=Path,
+        default=INDEX_FILE,
+        help='Index file (default: build/search.idx)'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build or update the index')
+    build_parser.add_argument(
+        '-f', '--force',
+        action='store_true',
+        help='Re-tokenize every file'
+    )
+
+    query_parser = subparsers.add_parser('query', help='Search the index')
+    query_parser.add_argument('text', help="Query text (suffix a word with * for prefix search)")
+    query_parser.add_argument(
+        '-n', '--limit',
+        type=int,
+        default=10,
+        help='Number of results (default: 10)'
+    )
+    query_parser.add_argument(
+        '--no-update',
+        action='store_true',
+        help='Query the index as is, without checking for changed files'
+    )
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'build':
+            IndexBuilder(args.index, args.data_dir).run(force=args.force)
+            return
+
+        import time
+
+        index = open_index(args.index, args.data_dir, update=not args.no_update)
+        start = time.perf_counter()
+        results = index.search(args.text, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        for result in results:
+            print(f"{result['score']:8.3f}  {result['ref']}  ({result['title']})")
+        print(f"\n{len(results)} results in {elapsed:.2f} ms")
+        index.close()
+
+    except Exception as e:
+        print(f"\n✗ Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
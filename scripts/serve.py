@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Query Server
+Serve the corpus over HTTP from in-memory indexes (asyncio, stdlib only):
+
+    python3 scripts/serve.py --port 8000
+
+    GET /places?province=casablanca&kind=culture/museum
+    GET /near?lat=33.5943&lon=-7.6145&r=1.5
+    GET /search?q=art+deco+cinema
+    GET /maps/casablanca-mohammed-v-walk
+
+Responses are JSON, cached per corpus version and carry an ETag, so
+repeated requests are answered from memory and revalidations with
+If-None-Match get a 304. Data files are watched and the corpus is reloaded
+in the background when they change; requests keep being served from the
+previous version until the new one is ready.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from corpus import (
+    DATA_DIR, FileCache, FileWatcher, composite_id, file_signature,
+    haversine_km, iter_paths, load_json, place_ref, relative_key,
+)
+from search import INDEX_FILE, IndexBuilder, SearchIndex
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bump when the cached per-file entries change shape
+SERVE_VERSION = 2
+
+KM_PER_DEGREE_LAT = 111.2
+
+DEFAULT_RADIUS_KM = 1.0
+MAX_RADIUS_KM = 50.0
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+# Responses kept per corpus version (oldest dropped first)
+MAX_CACHED_RESPONSES = 4096
+
+# Map queries use a small subset of JMESPath: comparisons joined by || and &&
+MAP_CLAUSE = re.compile(r"^\s*([\w.]+)\s*==\s*'([^']*)'\s*$")
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+}
+
+
+class RequestError(Exception):
+    """Client error answered with a JSON {"error": ...} body"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================================
+# CORPUS
+# ============================================================================
+
+def as_object(value: Any) -> Dict[str, Any]:
+    """value if it is a JSON object, else {} (files are not schema-checked here)"""
+    return value if isinstance(value, dict) else {}
+
+
+def as_number(value: Any) -> Optional[float]:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def as_string(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def place_entry(path: Path, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary of a place as returned by the API"""
+    doc = as_object(doc)
+    spec = as_object(doc.get('spec'))
+    location = as_object(spec.get('location'))
+    latitude, longitude = as_number(location.get('latitude')), as_number(location.get('longitude'))
+    return {
+        'id': composite_id('places', path, doc),
+        'name': spec.get('name'),
+        'kind': as_string(doc.get('kind')),
+        'province': as_string(location.get('province')),
+        # Both or neither, so the latitude index only holds usable points
+        'latitude': latitude if longitude is not None else None,
+        'longitude': longitude if latitude is not None else None,
+    }
+
+
+def map_entry(path: Path, doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc = as_object(doc)
+    spec = as_object(doc.get('spec'))
+    content = as_object(spec.get('content'))
+    ids = content.get('ids')
+    tags = as_object(doc.get('metadata')).get('tags')
+    return {
+        'id': path.stem,
+        'title': spec.get('title'),
+        'description': spec.get('description'),
+        'tags': tags if isinstance(tags, list) else [],
+        'strategy': as_string(spec.get('strategy')),
+        'content': {
+            'ids': [ref for ref in ids if isinstance(ref, str)] if isinstance(ids, list) else [],
+            'query': as_string(content.get('query')),
+        },
+    }
+
+
+def map_query_matcher(query: str):
+    """
+    Compile a map query like "location.province == 'province/sale' && kind == 'x'"
+
+    As in web/scripts/build_maps.ts, fields are looked up on the place spec
+    with `kind` alongside it.
+    """
+    alternatives = []
+    for alternative in query.split('||'):
+        clauses = []
+        for clause in alternative.split('&&'):
+            match = MAP_CLAUSE.match(clause)
+            if not match:
+                raise ValueError(f"Unsupported map query: {query}")
+            clauses.append((match.group(1), match.group(2)))
+        alternatives.append(clauses)
+
+    def matches(place: Dict[str, Any]) -> bool:
+        return any(all(place.get(field) == value for field, value in clauses)
+                   for clauses in alternatives)
+
+    return matches
+
+
+class Corpus:
+    """
+    One immutable version of the served data
+
+    Places are indexed by province, kind and latitude; each version has its
+    own response cache, so a reload never serves stale bodies.
+    """
+
+    def __init__(self, version: str, places: List[Dict[str, Any]],
+                 maps: Dict[str, Dict[str, Any]], search: SearchIndex):
+        self.version = version
+        self.places = places
+        self.maps = maps
+        self.search_index = search
+        self.responses: Dict[str, Tuple[str, bytes]] = {}
+
+        self.by_ref = {place['id']: i for i, place in enumerate(places)}
+        self.by_province: Dict[str, List[int]] = {}
+        self.by_kind: Dict[str, List[int]] = {}
+        for i, place in enumerate(places):
+            self.by_province.setdefault(place['province'], []).append(i)
+            self.by_kind.setdefault(place['kind'], []).append(i)
+
+        # Places with coordinates, sorted by latitude for range scans
+        located = sorted(
+            (place['latitude'], i) for i, place in enumerate(places)
+            if place['latitude'] is not None and place['longitude'] is not None
+        )
+        self.latitudes = [lat for lat, _ in located]
+        self.by_latitude = [i for _, i in located]
+
+    def close(self):
+        self.search_index.close()
+
+    # ------------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------------
+
+    def filter_places(self, province: Optional[str], kind: Optional[str]) -> List[Dict[str, Any]]:
+        """Places in a province and/or of a kind ('culture' matches every culture/*)"""
+        selected = None
+
+        if province:
+            if not province.startswith('province/'):
+                province = f"province/{province}"
+            selected = set(self.by_province.get(province, []))
+
+        if kind:
+            if '/' in kind:
+                positions = set(self.by_kind.get(kind, []))
+            else:
+                positions = {i for k, group in self.by_kind.items()
+                             if k and k.split('/')[0] == kind for i in group}
+            selected = positions if selected is None else selected & positions
+
+        if selected is None:
+            return list(self.places)
+        return [self.places[i] for i in sorted(selected)]
+
+    def near(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
+        """Places within radius_km, closest first"""
+        delta = radius_km / KM_PER_DEGREE_LAT
+        lo = bisect_left(self.latitudes, lat - delta)
+        hi = bisect_right(self.latitudes, lat + delta)
+
+        found = []
+        for i in self.by_latitude[lo:hi]:
+            place = self.places[i]
+            distance = haversine_km(lat, lon, place['latitude'], place['longitude'])
+            if distance <= radius_km:
+                found.append((distance, i))
+
+        found.sort()
+        return [dict(self.places[i], distance_km=round(distance, 3)) for distance, i in found[:limit]]
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return self.search_index.search(query, limit)
+
+    def map(self, map_id: str) -> Optional[Dict[str, Any]]:
+        """A map with its places resolved (explicit ids and/or query)"""
+        entry = self.maps.get(map_id)
+        if entry is None:
+            return None
+
+        strategy = entry['strategy']
+        content = entry['content']
+        positions = []
+
+        if strategy in ('explicit', 'mixed'):
+            for ref in content.get('ids', []):
+                i = self.by_ref.get(place_ref(ref))
+                if i is not None:
+                    positions.append(i)
+
+        if strategy in ('query', 'mixed') and content.get('query'):
+            matches = map_query_matcher(content['query'])
+            for i, place in enumerate(self.places):
+                if matches({'kind': place['kind'], 'location.province': place['province']}):
+                    positions.append(i)
+
+        unique = list(dict.fromkeys(positions))
+        return {
+            'id': entry['id'],
+            'title': entry['title'],
+            'description': entry['description'],
+            'tags': entry['tags'],
+            'places': [self.places[i] for i in unique],
+        }
+
+
+class CorpusLoader:
+    """Build Corpus versions, re-reading only files changed since the last load"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, index_file: Path = INDEX_FILE):
+        self.data_dir = Path(data_dir)
+        self.cache = FileCache('serve', tag=str(SERVE_VERSION))
+        self.index_builder = IndexBuilder(index_file, self.data_dir)
+
+    def log(self, message: str):
+        print(f"[SERVE] {message}")
+
+    def load(self) -> Corpus:
+        start = time.perf_counter()
+        digest = hashlib.sha1()
+        keys = set()
+        entries: Dict[str, List[Dict[str, Any]]] = {'places': [], 'maps': []}
+
+        for collection, build in [('places', place_entry), ('maps', map_entry)]:
+            for path in iter_paths(collection, self.data_dir):
+                key = relative_key(path, self.data_dir)
+                signature = file_signature(path)
+                keys.add(key)
+                digest.update(f"{key}:{signature}".encode('utf-8'))
+
+                entry = self.cache.get(key, signature)
+                if entry is None:
+                    entry = build(path, load_json(path))
+                    self.cache.put(key, signature, entry)
+                entries[collection].append(entry)
+
+        # People are only served through search, but still change the version
+        for path in iter_paths('people', self.data_dir):
+            digest.update(f"{relative_key(path, self.data_dir)}:{file_signature(path)}".encode('utf-8'))
+
+        self.cache.prune(keys)
+        self.cache.save()
+        self.index_builder.run()
+
+        corpus = Corpus(
+            digest.hexdigest(),
+            entries['places'],
+            {entry['id']: entry for entry in entries['maps']},
+            SearchIndex(self.index_builder.index_file),
+        )
+        self.log(f"Loaded {len(corpus.places)} places and {len(corpus.maps)} maps "
+                 f"(version {corpus.version[:12]}) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return corpus
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+def query_param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[0] if values else None
+
+
+def number_param(params: Dict[str, List[str]], name: str, default: Optional[float] = None,
+                 low: float = -math.inf, high: float = math.inf) -> float:
+    value = query_param(params, name)
+    if value is None:
+        if default is None:
+            raise RequestError(400, f"Missing parameter: {name}")
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise RequestError(400, f"Invalid number for {name}: {value}")
+    if not (low <= number <= high):
+        raise RequestError(400, f"{name} must be between {low:g} and {high:g}")
+    return number
+
+
+def limit_param(params: Dict[str, List[str]], default: int = DEFAULT_LIMIT) -> int:
+    return int(number_param(params, 'limit', default, 1, MAX_LIMIT))
+
+
+class Server:
+    """asyncio HTTP/1.1 server (keep-alive, GET/HEAD) over the current Corpus"""
+
+    def __init__(self, loader: CorpusLoader):
+        self.loader = loader
+        self.corpus = loader.load()
+
+    def log(self, message: str):
+        print(f"[SERVE] {message}")
+
+    # ------------------------------------------------------------------------
+    # routing
+    # ------------------------------------------------------------------------
+
+    def route(self, corpus: Corpus, target: str) -> Any:
+        """Compute the JSON payload for a request target"""
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        path = url.path.rstrip('/') or '/'
+
+        if path == '/places':
+            places = corpus.filter_places(query_param(params, 'province'), query_param(params, 'kind'))
+            return {'count': len(places), 'places': places}
+
+        if path == '/near':
+            places = corpus.near(
+                number_param(params, 'lat', low=-90, high=90),
+                number_param(params, 'lon', low=-180, high=180),
+                number_param(params, 'r', DEFAULT_RADIUS_KM, 0, MAX_RADIUS_KM),
+                limit_param(params),
+            )
+            return {'count': len(places), 'places': places}
+
+        if path == '/search':
+            query = query_param(params, 'q')
+            if not query:
+                raise RequestError(400, "Missing parameter: q")
+            results = corpus.search(query, limit_param(params, 10))
+            return {'count': len(results), 'results': results}
+
+        if path.startswith('/maps/'):
+            resolved = corpus.map(path[len('/maps/'):])
+            if resolved is None:
+                raise RequestError(404, f"Unknown map: {path[len('/maps/'):]}")
+            return resolved
+
+        raise RequestError(404, f"Not found: {url.path}")
+
+    def respond(self, target: str) -> Tuple[int, Optional[str], bytes]:
+        """(status, etag, body) for a GET, served from the version's cache when possible"""
+        corpus = self.corpus
+        cached = corpus.responses.get(target)
+        if cached is not None:
+            return 200, cached[0], cached[1]
+
+        try:
+            payload = self.route(corpus, target)
+        except RequestError as e:
+            return e.status, None, json.dumps({'error': str(e)}).encode('utf-8')
+        except ValueError as e:
+            return 400, None, json.dumps({'error': str(e)}).encode('utf-8')
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+        if len(corpus.responses) >= MAX_CACHED_RESPONSES:
+            del corpus.responses[next(iter(corpus.responses))]
+        corpus.responses[target] = (etag, body)
+        return 200, etag, body
+
+    # ------------------------------------------------------------------------
+    # connections
+    # ------------------------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    self.write(writer, 400, None, b'{"error":"Malformed request"}', False, False)
+                    break
+                method, target, version = parts
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                if method not in ('GET', 'HEAD'):
+                    self.write(writer, 405, None, b'{"error":"Method not allowed"}', keep_alive, False)
+                else:
+                    status, etag, body = self.respond(target)
+                    if status == 200 and etag and headers.get('if-none-match') == etag:
+                        status, body = 304, b''
+                    self.write(writer, status, etag, body, keep_alive, method == 'HEAD')
+
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # ValueError: header line over the stream limit or bad Content-Length
+            pass
+        finally:
+            writer.close()
+
+    def write(self, writer: asyncio.StreamWriter, status: int, etag: Optional[str],
+              body: bytes, keep_alive: bool, head: bool):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        if etag:
+            lines.append(f"ETag: {etag}")
+        if status != 304:
+            lines.append("Content-Type: application/json; charset=utf-8")
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if body and not head:
+            writer.write(body)
+
+    # ------------------------------------------------------------------------
+    # reloading
+    # ------------------------------------------------------------------------
+
+    def swap(self, corpus: Corpus):
+        previous, self.corpus = self.corpus, corpus
+        previous.close()
+
+    def watch(self, loop: asyncio.AbstractEventLoop, polling: bool):
+        """Reload on data changes (runs in its own thread)"""
+        watcher = FileWatcher([self.loader.data_dir], polling=polling)
+        self.log(f"Watching {self.loader.data_dir} ({watcher.mode})")
+
+        for changed in watcher.changes():
+            self.log(f"{len(changed)} file(s) changed, reloading")
+            try:
+                corpus = self.loader.load()
+            except Exception as e:
+                # Never let a bad file end this thread: that would serve stale data forever
+                self.log(f"Reload failed, still serving version {self.corpus.version[:12]}: "
+                         f"{type(e).__name__}: {e}")
+                continue
+            loop.call_soon_threadsafe(self.swap, corpus)
+
+    async def serve(self, host: str, port: int, reload: bool, polling: bool):
+        if reload:
+            thread = threading.Thread(target=self.watch, args=(asyncio.get_running_loop(), polling),
+                                      daemon=True)
+            thread.start()
+
+        server = await asyncio.start_server(self.handle, host, port)
+        self.log(f"Listening on http://{host}:{port}, Ctrl-C to stop")
+        async with server:
+            await server.serve_forever()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve Mrrakc places, maps and search over HTTP'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Address to listen on (default: 127.0.0.1)'
+    )
+
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8000,
+        help='Port to listen on (default: 8000)'
+    )
+
+    parser.add_argument(
+        '--no-reload',
+        action='store_true',
+        help='Do not watch data files for changes'
+    )
+
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll for changes instead of using inotify'
+    )
+
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    try:
+        server = Server(CorpusLoader(args.data_dir.resolve()))
+        asyncio.run(server.serve(args.host, args.port, not args.no_reload, args.poll))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"\n✗ Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Dataset Statistics
+Coverage report over places and people, to see where data is thin:
+
+    python3 scripts/stats.py                      # Markdown tables
+    python3 scripts/stats.py --format json -o build/stats.json
+
+The report has places per province (and how many have a timeline, links
+and people), places per kind (including kinds never used), places per
+time period, and field completeness for places and people.
+
+Each data file is reduced to a few facts in one streaming pass; the facts
+are cached by file signature, so later runs only re-read changed files.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from corpus import (
+    DATA_DIR, SCHEMA_DIR, FileCache, composite_id, file_signature, iter_paths,
+    load_json, relative_key,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bump when the cached facts change shape
+STATS_VERSION = 1
+
+KINDS_ENUM = SCHEMA_DIR / 'enums' / 'kinds.json'
+
+# Optional fields whose presence is counted, per collection
+COMPLETENESS_FIELDS = {
+    'places': ['metadata.tags', 'location.altitude', 'people', 'timeline', 'links',
+               'activities', 'items', 'access.options', 'timePeriods', 'comments'],
+    'people': ['metadata.tags', 'birthPlace', 'designations', 'timeline', 'links', 'comments'],
+}
+
+# Per-province columns (also completeness fields)
+PROVINCE_FIELDS = ['timeline', 'links', 'people']
+
+# Label for places without a province or kind
+MISSING = '(none)'
+
+
+# ============================================================================
+# FACTS
+# ============================================================================
+
+def has_value(doc: Dict[str, Any], field: str) -> bool:
+    """True when a dotted field (under spec, or metadata.*) is present and non-empty"""
+    parts = field.split('.')
+    value = doc if parts[0] == 'metadata' else doc.get('spec', {})
+    for part in parts:
+        if not isinstance(value, dict):
+            return False
+        value = value.get(part)
+    return value not in (None, '', [], {})
+
+
+def extract(collection: str, path: Path, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """The facts the report needs from one data file"""
+    spec = doc.get('spec', {})
+    facts = {
+        'ref': composite_id(collection, path, doc),
+        'fields': [field for field in COMPLETENESS_FIELDS[collection] if has_value(doc, field)],
+    }
+    if collection == 'places':
+        facts['province'] = spec.get('location', {}).get('province')
+        facts['kind'] = doc.get('kind')
+        facts['timePeriods'] = spec.get('timePeriods', [])
+    return facts
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def percent(count: int, total: int) -> float:
+    return round(100.0 * count / total, 1) if total else 0.0
+
+
+class StatsBuilder:
+    """Aggregate cached per-file facts into the coverage report"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, kinds_enum: Path = KINDS_ENUM):
+        self.data_dir = Path(data_dir)
+        self.kinds_enum = Path(kinds_enum)
+
+    def log(self, message: str):
+        print(f"[STATS] {message}", file=sys.stderr)
+
+    def collect(self) -> Dict[str, List[Dict[str, Any]]]:
+        cache = FileCache('stats', tag=str(STATS_VERSION))
+        facts: Dict[str, List[Dict[str, Any]]] = {'places': [], 'people': []}
+        keys = set()
+
+        for collection in facts:
+            for path in iter_paths(collection, self.data_dir):
+                key = relative_key(path, self.data_dir)
+                signature = file_signature(path)
+                keys.add(key)
+
+                entry = cache.get(key, signature)
+                if entry is None:
+                    entry = extract(collection, path, load_json(path))
+                    cache.put(key, signature, entry)
+                facts[collection].append(entry)
+
+        cache.prune(keys)
+        cache.save()
+        self.log(f"{cache.misses} files read, {cache.hits} from cache")
+        return facts
+
+    def run(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        facts = self.collect()
+        places, people = facts['places'], facts['people']
+
+        # Every province file is listed, so empty provinces show up too
+        province_files = {composite_id('provinces', path, {}) for path in iter_paths('provinces', self.data_dir)}
+        provinces = {province: {'places': 0, **{f: 0 for f in PROVINCE_FIELDS}} for province in province_files}
+        kinds: Dict[str, int] = {}
+        if self.kinds_enum.exists():
+            kinds = {kind: 0 for kind in load_json(self.kinds_enum).get('enum', [])}
+
+        # Time periods are grouped case-insensitively; each keeps its spellings
+        periods: Dict[str, Dict[str, int]] = {}
+
+        for place in places:
+            province = place['province'] or MISSING
+            row = provinces.setdefault(province, {'places': 0, **{f: 0 for f in PROVINCE_FIELDS}})
+            row['places'] += 1
+            for field in PROVINCE_FIELDS:
+                row[field] += field in place['fields']
+
+            kind = place['kind'] or MISSING
+            kinds[kind] = kinds.get(kind, 0) + 1
+
+            for period in place['timePeriods']:
+                spellings = periods.setdefault(period.lower(), {})
+                spellings[period] = spellings.get(period, 0) + 1
+
+        completeness = {}
+        for collection, records in facts.items():
+            counts = {field: 0 for field in COMPLETENESS_FIELDS[collection]}
+            for record in records:
+                for field in record['fields']:
+                    counts[field] += 1
+            completeness[collection] = {
+                field: {'count': count, 'percent': percent(count, len(records))}
+                for field, count in counts.items()
+            }
+
+        report = {
+            'totals': {'places': len(places), 'people': len(people), 'provinces': len(province_files)},
+            'provinces': dict(sorted(provinces.items(), key=lambda item: (-item[1]['places'], item[0]))),
+            'kinds': dict(sorted(kinds.items(), key=lambda item: (-item[1], item[0]))),
+            'unusedKinds': sorted(kind for kind, count in kinds.items() if count == 0),
+            'unknownProvinces': sorted(p for p in provinces if p not in province_files),
+            'timePeriods': {
+                max(spellings, key=spellings.get): {
+                    'count': sum(spellings.values()),
+                    'spellings': dict(sorted(spellings.items())),
+                }
+                for spellings in sorted(periods.values(), key=lambda s: -sum(s.values()))
+            },
+            'completeness': completeness,
+        }
+        self.log(f"Report built in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return report
+
+
+def to_markdown(report: Dict[str, Any]) -> str:
+    lines = ['# Mrrakc dataset statistics', '']
+    totals = report['totals']
+    lines.append(f"{totals['places']} places, {totals['people']} people, {totals['provinces']} provinces.")
+
+    def table(title: str, headers: List[str], rows: List[List[Any]], numeric: int = 0):
+        """Markdown table; the `numeric` columns after the first are right-aligned"""
+        numeric = numeric or len(headers) - 1
+        lines.extend(['', f"## {title}", ''])
+        lines.append('| ' + ' | '.join(headers) + ' |')
+        aligns = ['---'] + ['---:'] * numeric + ['---'] * (len(headers) - 1 - numeric)
+        lines.append('|' + '|'.join(aligns) + '|')
+        for row in rows:
+            lines.append('| ' + ' | '.join(str(cell) for cell in row) + ' |')
+
+    table('Places per province', ['Province', 'Places'] + [f"With {f}" for f in PROVINCE_FIELDS], [
+        [province, row['places']] + [f"{row[f]} ({percent(row[f], row['places'])}%)" for f in PROVINCE_FIELDS]
+        for province, row in report['provinces'].items()
+    ])
+    if report['unknownProvinces']:
+        lines.extend(['', "Provinces referenced by places but missing from data/provinces: "
+                      + ', '.join(f"`{province}`" for province in report['unknownProvinces'])])
+
+    table('Places per kind', ['Kind', 'Places'], [
+        [kind, count] for kind, count in report['kinds'].items() if count
+    ])
+    if report['unusedKinds']:
+        lines.extend(['', f"Unused kinds ({len(report['unusedKinds'])}): "
+                      + ', '.join(f"`{kind}`" for kind in report['unusedKinds'])])
+
+    table('Places per time period', ['Time period', 'Places', 'Spellings'], [
+        [period, entry['count'], ', '.join(entry['spellings']) if len(entry['spellings']) > 1 else '']
+        for period, entry in report['timePeriods'].items()
+    ], numeric=1)
+
+    for collection, fields in report['completeness'].items():
+        table(f"Field completeness: {collection}", ['Field', 'Records', 'Percent'], [
+            [f"`{field}`", entry['count'], f"{entry['percent']}%"] for field, entry in fields.items()
+        ])
+
+    return '\n'.join(lines) + '\n'
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Report coverage statistics of the Mrrakc dataset'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '-f', '--format',
+        choices=['markdown', 'json'],
+        default='markdown',
+        help='Output format (default: markdown)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        help='Output file (default: stdout)'
+    )
+
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    report = StatsBuilder(args.data_dir).run()
+    if args.format == 'json':
+        text = json.dumps(report, indent=2, ensure_ascii=False) + '\n'
+    else:
+        text = to_markdown(report)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding='utf-8')
+        print(f"[STATS] Wrote {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == '__main__':
+    main()
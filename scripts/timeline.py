@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Timeline Query Engine
+Collect every timeline event of places and people into date-sorted arrays
+and answer range queries by binary search:
+
+    python3 scripts/timeline.py between 1912 1956
+    python3 scripts/timeline.py province casablanca 1930s
+    python3 scripts/timeline.py related people/henri-prost --from 1900
+
+Events are cached per data file, so building the engine only re-reads the
+files that changed since the last run.
+"""
+
+import argparse
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from corpus import (
+    DATA_DIR, FileCache, composite_id, file_signature, iter_paths,
+    load_json, relative_key,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bump when the cached per-file facts change shape
+TIMELINE_VERSION = 1
+
+
+# ============================================================================
+# DATES
+# ============================================================================
+
+def lower_bound_key(date: Optional[str]) -> str:
+    """Query start as a sortable key ('1912' matches from 1912-01-01)"""
+    return date or ''
+
+
+def upper_bound_key(date: Optional[str]) -> str:
+    """Query end as a sortable key ('1956' matches up to 1956-12-31)"""
+    if not date:
+        return '\uffff'
+    # '~' sorts after '-' and digits, so a partial date covers its whole span
+    return date + '~' if len(date) < 10 else date
+
+
+def decade_range(decade: str) -> Tuple[str, str]:
+    """'1930s' or '1930' -> ('1930', '1939')"""
+    start = int(decade.rstrip('s'))
+    start -= start % 10
+    return f"{start:04d}", f"{start + 9:04d}"
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class TimelineIndex:
+    """
+    Array-backed index over all timeline events
+
+    Events are stored as parallel lists sorted by date. Per-owner and
+    per-province views keep their own sorted date arrays pointing back into
+    the main lists, so every query is a bisect plus a slice.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], links: Dict[str, List[str]]):
+        events = sorted(events, key=lambda e: (e['date'], e['owner']))
+
+        self.dates = [e['date'] for e in events]
+        self.owners = [e['owner'] for e in events]
+        self.provinces = [e['province'] for e in events]
+        self.titles = [e['title'] for e in events]
+        self.descriptions = [e['description'] for e in events]
+
+        # owner/province -> (sorted dates, positions in the main arrays)
+        self.by_owner = self.group(self.owners)
+        self.by_province = self.group(self.provinces)
+
+        # Undirected place <-> person links from place.people
+        self.links = links
+
+    def group(self, keys: List[Optional[str]]) -> Dict[str, Tuple[List[str], List[int]]]:
+        groups: Dict[str, Tuple[List[str], List[int]]] = {}
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+            dates, positions = groups.setdefault(key, ([], []))
+            dates.append(self.dates[i])
+            positions.append(i)
+        return groups
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def event(self, i: int) -> Dict[str, Any]:
+        return {
+            'date': self.dates[i],
+            'owner': self.owners[i],
+            'province': self.provinces[i],
+            'title': self.titles[i],
+            'description': self.descriptions[i],
+        }
+
+    def slice(self, dates: List[str], start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        return (bisect_left(dates, lower_bound_key(start)),
+                bisect_right(dates, upper_bound_key(end)))
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All events with start <= date <= end (bounds may be partial dates)"""
+        lo, hi = self.slice(self.dates, start, end)
+        return [self.event(i) for i in range(lo, hi)]
+
+    def in_province(self, province: str, start: Optional[str] = None,
+                    end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Events of places in a province (province/<id> or <id>)"""
+        if not province.startswith('province/'):
+            province = f"province/{province}"
+        dates, positions = self.by_province.get(province, ([], []))
+        lo, hi = self.slice(dates, start, end)
+        return [self.event(positions[i]) for i in range(lo, hi)]
+
+    def for_owner(self, ref: str, start: Optional[str] = None,
+                  end: Optional[str] = None) -> List[Dict[str, Any]]:
+        dates, positions = self.by_owner.get(ref, ([], []))
+        lo, hi = self.slice(dates, start, end)
+        return [self.event(positions[i]) for i in range(lo, hi)]
+
+    def related(self, ref: str, start: Optional[str] = None,
+                end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Events of a record and of the records linked to it
+
+        For a place: its own events plus those of its people. For a person:
+        their events plus those of every place listing them.
+        """
+        events = self.for_owner(ref, start, end)
+        for other in self.links.get(ref, []):
+            events.extend(self.for_owner(other, start, end))
+        events.sort(key=lambda e: (e['date'], e['owner']))
+        return events
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+def extract(collection: str, path: Path, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Events and people links of one data file"""
+    spec = doc.get('spec', {})
+    ref = composite_id(collection, path, doc)
+    province = spec.get('location', {}).get('province') if collection == 'places' else None
+
+    events = [
+        {
+            'date': event.get('date', ''),
+            'owner': ref,
+            'province': province,
+            'title': event.get('title', ''),
+            'description': event.get('description', ''),
+        }
+        for event in spec.get('timeline', [])
+        if event.get('date')
+    ]
+
+    people = [p['id'] for p in spec.get('people', []) if p.get('id')] if collection == 'places' else []
+    return {'ref': ref, 'events': events, 'people': people}
+
+
+def build_index(data_dir: Path = DATA_DIR) -> TimelineIndex:
+    """Build the engine, re-reading only files changed since the last build"""
+    cache = FileCache('timeline', tag=str(TIMELINE_VERSION))
+    events = []
+    links: Dict[str, List[str]] = {}
+    keys = set()
+
+    for collection in ['places', 'people']:
+        for path in iter_paths(collection, data_dir):
+            key = relative_key(path, data_dir)
+            signature = file_signature(path)
+            keys.add(key)
+
+            entry = cache.get(key, signature)
+            if entry is None:
+                entry = extract(collection, path, load_json(path))
+                cache.put(key, signature, entry)
+
+            events.extend(entry['events'])
+            for person in entry['people']:
+                links.setdefault(entry['ref'], []).append(person)
+                links.setdefault(person, []).append(entry['ref'])
+
+    cache.prune(keys)
+    cache.save()
+    return TimelineIndex(events, {ref: sorted(set(others)) for ref, others in links.items()})
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Query timeline events of Mrrakc places and people'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print events as JSON lines'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    between_parser = subparsers.add_parser('between', help='Events in a date range')
+    between_parser.add_argument('start', help='Start date (YYYY, YYYY-MM or YYYY-MM-DD)')
+    between_parser.add_argument('end', help='End date, inclusive')
+
+    province_parser = subparsers.add_parser('province', help='Events of places in a province')
+    province_parser.add_argument('province', help='Province id (e.g. casablanca)')
+    province_parser.add_argument('decade', nargs='?', help='Decade (e.g. 1930s)')
+
+    related_parser = subparsers.add_parser('related', help='Events of a record and its linked people/places')
+    related_parser.add_argument('ref', help='Record reference (e.g. people/henri-prost)')
+    related_parser.add_argument('--from', dest='start', help='Start date')
+    related_parser.add_argument('--to', dest='end', help='End date, inclusive')
+
+    args = parser.parse_args()
+
+    try:
+        index = build_index(args.data_dir)
+
+        if args.command == 'between':
+            events = index.between(args.start, args.end)
+        elif args.command == 'province':
+            start, end = decade_range(args.decade) if args.decade else (None, None)
+            events = index.in_province(args.province, start, end)
+        else:
+            events = index.related(args.ref, args.start, args.end)
+
+        for event in events:
+            if args.json:
+                print(json.dumps(event, ensure_ascii=False))
+            else:
+                print(f"{event['date']}  {event['owner']}  {event['title']}")
+
+        if not args.json:
+            print(f"\n{len(events)} of {len(index)} events")
+
+    except ValueError as e:
+        print(f"\n✗ Error: {e}\n")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
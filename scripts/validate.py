@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Mrrakc Data Validator
+Validate data files against the JSON schemas (as the CI does with boon),
+check cross-file references and compare place coordinates with their
+province.
+
+    python3 scripts/validate.py                  # validate everything once
+    python3 scripts/validate.py --watch          # re-validate touched files
+    python3 scripts/validate.py --watch --export # ...and refresh build/ outputs
+
+In watch mode the compiled schemas, the reference index and the province
+boundaries stay in memory, so each edit only costs validating the files
+that changed, plus the files referring to one that was created, deleted
+or renamed.
+
+Schema validation uses the jsonschema package when it is installed and
+falls back to running boon on the changed files.
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from corpus import (
+    COLLECTIONS, DATA_DIR, ROOT_DIR, SCHEMA_DIR, FileWatcher, collection_of,
+    composite_id, iter_paths, load_json, place_ref,
+)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PROVINCE_GEOJSON = ROOT_DIR / 'scripts' / 'mappings' / 'provinces.geojson'
+
+# Returned by the province locator when no polygon contains the point
+UNKNOWN_PROVINCE = 'province/unknown'
+
+
+# ============================================================================
+# SCHEMAS
+# ============================================================================
+
+class SchemaValidator:
+    """Compiled JSON schemas, one per collection"""
+
+    def __init__(self, schema_dir: Path = SCHEMA_DIR):
+        self.schema_dir = Path(schema_dir)
+        self.validators = {}
+        self.backend = None
+        self.compile()
+
+    def compile(self):
+        try:
+            import jsonschema
+        except ImportError:
+            self.backend = 'boon' if shutil.which('boon') else None
+            return
+
+        # Give every schema its file URI as $id so relative $refs resolve
+        schemas = {}
+        for path in self.schema_dir.rglob('*.json'):
+            schema = load_json(path)
+            schema['$id'] = path.resolve().as_uri()
+            schemas[schema['$id']] = schema
+
+        try:
+            from referencing import Registry, Resource
+
+            registry = Registry().with_resources(
+                (uri, Resource.from_contents(schema)) for uri, schema in schemas.items()
+            )
+
+            def make(schema):
+                return jsonschema.Draft7Validator(schema, registry=registry)
+        except ImportError:
+            # jsonschema < 4.18
+            def make(schema):
+                resolver = jsonschema.RefResolver(schema['$id'], schema, store=schemas)
+                return jsonschema.Draft7Validator(schema, resolver=resolver)
+
+        self.validators = {}
+        for collection in COLLECTIONS:
+            uri = (self.schema_dir / f"{collection}.json").resolve().as_uri()
+            if uri in schemas:
+                self.validators[collection] = make(schemas[uri])
+        self.backend = 'jsonschema'
+
+    def validate(self, collection: str, doc: Dict[str, Any]) -> List[str]:
+        """Schema errors for one document (jsonschema backend only)"""
+        validator = self.validators.get(collection)
+        if validator is None:
+            return []
+        return [
+            f"{'/'.join(str(p) for p in error.absolute_path) or '<root>'}: {error.message}"
+            for error in validator.iter_errors(doc)
+        ]
+
+    def validate_with_boon(self, collection: str, paths: List[Path]) -> Dict[Path, List[str]]:
+        """Run boon on a batch of files; boon only reports pass/fail per run"""
+        if not paths:
+            return {}
+        schema = self.schema_dir / f"{collection}.json"
+        result = subprocess.run(['boon', str(schema), *map(str, paths)],
+                                capture_output=True, text=True)
+        if result.returncode == 0:
+            return {}
+        output = (result.stdout + result.stderr).strip()
+        errors: Dict[Path, List[str]] = {}
+        for path in paths:
+            if str(path) in output:
+                errors[path] = [line.strip() for line in output.splitlines() if line.strip()][:5]
+        if not errors:
+            errors[paths[0]] = [output.splitlines()[-1] if output else 'boon validation failed']
+        return errors
+
+
+# ============================================================================
+# STRUCTURE
+# ============================================================================
+
+def json_type(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    return {dict: 'object', list: 'array', str: 'string'}.get(type(value), type(value).__name__)
+
+
+def is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def get_object(parent: Dict[str, Any], key: str, field: str, problems: List[str]) -> Dict[str, Any]:
+    """parent[key] if it is an object; {} otherwise, reported unless the key is absent"""
+    value = parent.get(key)
+    if isinstance(value, dict):
+        return value
+    if key in parent:
+        problems.append(f"{field}: expected an object, got {json_type(value)}")
+    return {}
+
+
+def get_list(parent: Dict[str, Any], key: str, field: str, problems: List[str]) -> List[Any]:
+    """parent[key] if it is an array; [] otherwise, reported unless the key is absent"""
+    value = parent.get(key)
+    if isinstance(value, list):
+        return value
+    if key in parent:
+        problems.append(f"{field}: expected an array, got {json_type(value)}")
+    return []
+
+
+def get_objects(parent: Dict[str, Any], key: str, field: str, problems: List[str]) -> List[Dict[str, Any]]:
+    """The object items of the array parent[key]; other items are reported"""
+    items = []
+    for i, item in enumerate(get_list(parent, key, field, problems)):
+        if isinstance(item, dict):
+            items.append(item)
+        else:
+            problems.append(f"{field}[{i}]: expected an object, got {json_type(item)}")
+    return items
+
+
+# ============================================================================
+# VALIDATOR
+# ============================================================================
+
+class Validator:
+    """Keeps schemas, references and province boundaries warm between runs"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, schema_dir: Path = SCHEMA_DIR,
+                 province_geojson: Optional[Path] = PROVINCE_GEOJSON):
+        self.data_dir = Path(data_dir)
+        self.schemas = SchemaValidator(schema_dir)
+
+        # Province locator from the KML converter
+        self.locator = None
+        if province_geojson and Path(province_geojson).exists():
+            from kml_to_places import EnrichStage
+            self.locator = EnrichStage(province_geojson_file=province_geojson,
+                                       default_province=UNKNOWN_PROVINCE)
+
+        # Known references per collection, kept up to date as files change
+        self.refs: Dict[str, set] = {collection: set() for collection in COLLECTIONS}
+        # Reverse index: reference -> files pointing at it
+        self.referrers: Dict[str, set] = {}
+        self.docs: Dict[Path, Dict[str, Any]] = {}
+
+        if self.schemas.backend is None:
+            self.log("Neither jsonschema nor boon is available: skipping schema checks")
+
+    def log(self, message: str):
+        print(f"[VALIDATE] {message}")
+
+    def load(self, path: Path) -> Optional[Dict[str, Any]]:
+        """(Re)load a file into the reference index; None if deleted or unreadable"""
+        collection = collection_of(path, self.data_dir)
+        old = self.docs.pop(path, None)
+        if old is not None:
+            self.refs[collection].discard(old['ref'])
+            for ref in old['references']:
+                self.referrers.get(ref, set()).discard(path)
+
+        if not path.exists():
+            return None
+
+        try:
+            doc = load_json(path)
+        except ValueError as e:
+            doc, error = None, f"Invalid JSON: {e}"
+        else:
+            error = None if isinstance(doc, dict) else 'expected a JSON object'
+        if error:
+            self.docs[path] = {'ref': None, 'doc': None, 'links': [], 'problems': [],
+                               'references': set(), 'error': error}
+            return self.docs[path]
+
+        links, problems = self.references(collection, doc)
+        entry = {
+            'ref': composite_id(collection, path, doc),
+            'doc': doc,
+            'links': links,
+            'problems': problems,
+            'references': {ref for ref, _, _ in links},
+            'error': None,
+        }
+        self.refs[collection].add(entry['ref'])
+        for ref in entry['references']:
+            self.referrers.setdefault(ref, set()).add(path)
+        self.docs[path] = entry
+        return entry
+
+    def update(self, paths: List[Path]) -> List[Path]:
+        """
+        Reload changed files; returns the ones to re-validate: the files
+        themselves, plus the files referring to a record that appeared or
+        disappeared (created, deleted, renamed or no longer parseable)
+        """
+        affected = set()
+        for path in paths:
+            old = self.docs.get(path)
+            old_ref = old['ref'] if old else None
+            entry = self.load(path)
+            new_ref = entry['ref'] if entry else None
+            if old_ref != new_ref:
+                for ref in (old_ref, new_ref):
+                    affected.update(self.referrers.get(ref, ()))
+            affected.add(path)
+        return sorted(p for p in affected if p in self.docs)
+
+    def references(self, collection: str, doc: Dict[str, Any]) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+        """
+        (reference, target collection, field) for every cross-file reference,
+        plus the type errors met on the way, so a document that parses but
+        breaks the schema is reported instead of crashing the walk
+        """
+        links: List[Tuple[str, str, str]] = []
+        problems: List[str] = []
+
+        def expect(ref: Any, target: str, field: str, normalize=None):
+            if ref is None or ref == '':
+                return
+            if not isinstance(ref, str):
+                problems.append(f"{field}: expected a string, got {json_type(ref)}")
+                return
+            links.append((normalize(ref) if normalize else ref, target, field))
+
+        spec = get_object(doc, 'spec', 'spec', problems)
+
+        if collection == 'places':
+            location = get_object(spec, 'location', 'location', problems)
+            for key in ('latitude', 'longitude'):
+                value = location.get(key)
+                if value is not None and not is_number(value):
+                    problems.append(f"location.{key}: expected a number, got {json_type(value)}")
+            expect(location.get('province'), 'provinces', 'location.province')
+            for person in get_objects(spec, 'people', 'people', problems):
+                expect(person.get('id'), 'people', 'people')
+
+        elif collection == 'people':
+            expect(spec.get('birthPlace'), 'provinces', 'birthPlace')
+
+        elif collection == 'maps':
+            content = get_object(spec, 'content', 'content', problems)
+            for place_id in get_list(content, 'ids', 'content.ids', problems):
+                expect(place_id, 'places', 'content.ids', place_ref)
+
+        elif collection == 'plans':
+            def walk(steps):
+                for step in steps:
+                    for place_id in get_list(step, 'placeIds', 'steps.placeIds', problems):
+                        expect(place_id, 'places', 'steps.placeIds', place_ref)
+                    for person in get_objects(step, 'people', 'steps.people', problems):
+                        expect(person.get('id'), 'people', 'steps.people')
+                    walk(get_objects(step, 'subSteps', 'steps.subSteps', problems))
+            walk(get_objects(spec, 'steps', 'steps', problems))
+
+        return links, problems
+
+    def check_references(self, links: List[Tuple[str, str, str]]) -> List[str]:
+        """Dangling references (reported as warnings: boon does not check them)"""
+        return [
+            f"{field}: unknown reference {ref}"
+            for ref, target, field in links
+            if ref not in self.refs[target]
+        ]
+
+    def check_province(self, doc: Dict[str, Any]) -> List[str]:
+        """Warn when a place's coordinates fall in another province, or in none"""
+        if self.locator is None:
+            return []
+        spec = doc.get('spec')
+        location = spec.get('location') if isinstance(spec, dict) else None
+        if not isinstance(location, dict):
+            return []
+        if not is_number(location.get('latitude')) or not is_number(location.get('longitude')):
+            return []
+        found, nearest = self.locator.locate_province(location)
+        if found == UNKNOWN_PROVINCE:
+            return ["coordinates are outside all province boundaries"]
+        if found != location.get('province'):
+            detail = f" ({nearest.describe()})" if nearest else ''
+            return [f"coordinates fall in {found}, not {location.get('province')}{detail}"]
+        if nearest and nearest.ambiguous:
+            return [f"coordinates are {nearest.describe()}"]
+        return []
+
+    def validate(self, paths: List[Path]) -> Dict[Path, Dict[str, List[str]]]:
+        """Validate already loaded files; returns path -> {'errors', 'warnings'}"""
+        report: Dict[Path, Dict[str, List[str]]] = {}
+        boon_batches: Dict[str, List[Path]] = {}
+
+        for path in paths:
+            entry = self.docs.get(path)
+            if entry is None:
+                continue
+            collection = collection_of(path, self.data_dir)
+            errors, warnings = [], []
+
+            if entry['error']:
+                errors.append(entry['error'])
+            else:
+                doc = entry['doc']
+                if self.schemas.backend == 'jsonschema':
+                    errors.extend(self.schemas.validate(collection, doc))
+                elif self.schemas.backend == 'boon':
+                    boon_batches.setdefault(collection, []).append(path)
+                errors.extend(entry['problems'])
+                warnings.extend(self.check_references(entry['links']))
+                if collection == 'places':
+                    warnings.extend(self.check_province(doc))
+
+            if errors or warnings:
+                report[path] = {'errors': errors, 'warnings': warnings}
+
+        for collection, batch in boon_batches.items():
+            for path, errors in self.schemas.validate_with_boon(collection, batch).items():
+                report.setdefault(path, {'errors': [], 'warnings': []})['errors'].extend(errors)
+
+        return report
+
+    def load_all(self) -> List[Path]:
+        paths = []
+        for collection in COLLECTIONS:
+            for path in iter_paths(collection, self.data_dir):
+                path = path.resolve()
+                self.load(path)
+                paths.append(path)
+        return paths
+
+    def print_report(self, report: Dict[Path, Dict[str, List[str]]], checked: int) -> int:
+        n_errors = 0
+        for path in sorted(report):
+            rel = path.relative_to(self.data_dir.resolve())
+            for error in report[path]['errors']:
+                print(f"  ✗ {rel}: {error}")
+                n_errors += 1
+            for warning in report[path]['warnings']:
+                print(f"  ! {rel}: {warning}")
+        self.log(f"Checked {checked} files: {n_errors} errors, "
+                 f"{sum(len(r['warnings']) for r in report.values())} warnings")
+        return n_errors
+
+
+# ============================================================================
+# WATCH
+# ============================================================================
+
+class OutputRefresher:
+    """Incremental build/ outputs, kept alive so their caches stay in memory"""
+
+    def __init__(self, data_dir: Path):
+        from build_sqlite import SQLiteBuilder
+        from corpus import BUILD_DIR
+        from export_corpus import Exporter
+        from search import IndexBuilder
+
+        self.builders = [
+            Exporter(data_dir),
+            IndexBuilder(data_dir=data_dir),
+            SQLiteBuilder(BUILD_DIR / 'mrrakc.sqlite', data_dir),
+        ]
+
+    def run(self):
+        for builder in self.builders:
+            builder.run()
+
+
+def watch(validator: Validator, schema_dir: Path, outputs: Optional[OutputRefresher], polling: bool):
+    watcher = FileWatcher([validator.data_dir, schema_dir], polling=polling)
+    validator.log(f"Watching {validator.data_dir} and {schema_dir} ({watcher.mode}), Ctrl-C to stop")
+
+    try:
+        for changed in watcher.changes():
+            # One bad batch (e.g. a builder choking on a half-saved file)
+            # must not end the watch
+            try:
+                start = time.perf_counter()
+                schema_root = Path(schema_dir).resolve()
+
+                if any(schema_root in path.parents for path in changed):
+                    validator.log("Schemas changed, recompiling and re-validating everything")
+                    validator.schemas.compile()
+                    paths = list(validator.docs)
+                else:
+                    changed = sorted(p for p in changed if collection_of(p, validator.data_dir))
+                    for path in changed:
+                        validator.log(f"Changed: {path.relative_to(validator.data_dir.resolve())}")
+                    paths = validator.update(changed)
+                validator.print_report(validator.validate(paths), len(paths))
+
+                if outputs:
+                    outputs.run()
+
+                validator.log(f"Done in {(time.perf_counter() - start) * 1000:.1f} ms")
+            except Exception as e:
+                validator.log(f"✗ Error: {type(e).__name__}: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Validate Mrrakc data files (schemas, references, provinces)'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=DATA_DIR,
+        help='Data directory (default: data/)'
+    )
+
+    parser.add_argument(
+        '--schema-dir',
+        type=Path,
+        default=SCHEMA_DIR,
+        help='Schema directory (default: schema/)'
+    )
+
+    parser.add_argument(
+        '-p', '--province-geojson',
+        type=Path,
+        default=PROVINCE_GEOJSON,
+        help='GeoJSON file with province boundaries (default: scripts/mappings/provinces.geojson)'
+    )
+
+    parser.add_argument(
+        '-w', '--watch',
+        action='store_true',
+        help='Keep running and re-validate files as they change'
+    )
+
+    parser.add_argument(
+        '--export',
+        action='store_true',
+        help='In watch mode, also refresh the export bundle, search index and SQLite database'
+    )
+
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll for changes instead of using inotify'
+    )
+
+    args = parser.parse_args()
+
+    if not args.data_dir.is_dir():
+        print(f"Error: Data directory not found: {args.data_dir}")
+        sys.exit(1)
+
+    data_dir = args.data_dir.resolve()
+    validator = Validator(data_dir, args.schema_dir, args.province_geojson)
+
+    start = time.perf_counter()
+    paths = validator.load_all()
+    n_errors = validator.print_report(validator.validate(paths), len(paths))
+    validator.log(f"Done in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.watch:
+        outputs = OutputRefresher(data_dir) if args.export else None
+        if outputs:
+            outputs.run()
+        watch(validator, args.schema_dir, outputs, args.poll)
+    elif n_errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()